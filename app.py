@@ -1,5 +1,6 @@
 import sys
 import os
+import multiprocessing
 
 sys.path.append(os.path.abspath('.'))
 
@@ -9,6 +10,7 @@ from src.utils.logger import setup_logger
 logger = setup_logger(__name__)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     try:
         controller = GeracaoKitController()
         folder_link = "https://drive.google.com/drive/folders/1m44U3rukbASLFWon8ewunDZbwF_47Ns-"
@@ -0,0 +1,183 @@
+"""
+Compara os motores de extração de texto de PDF (PDF_BACKEND) sobre um corpus de contratos sintéticos.
+
+Para cada motor instalado, mede páginas/segundo, pico de memória (RSS) e se as seções
+CONTRATANTE…CLÁUSULA encontradas por `Contrato._extrair_trecho` são as mesmas do PyPDF2.
+Cada motor roda num subprocesso próprio, para que o pico de RSS de um não contamine o outro.
+
+Uso: python benchmarks/pdf_backends.py [--contratos 40] [--paginas 8] [--backends pypdf2,pypdfium2,pdfminer]
+"""
+import sys
+import os
+import re
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+import subprocess
+
+sys.path.append(os.path.abspath('.'))
+
+NOMES = ['JOÃO DA SILVA SOUSA', 'MARIA APARECIDA DOS SANTOS', 'JOSÉ CARLOS PEREIRA', 'ANA PAULA FERREIRA LIMA']
+PROFISSOES = ['pedreiro', 'auxiliar de produção', 'motorista', 'operadora de caixa']
+RUAS = ['Rua das Flores', 'Av. Brasil', 'Rua São João', 'Tv. Santa Luzia']
+
+def _linhas_contrato(rng: random.Random) -> list[str]:
+    nome = rng.choice(NOMES)
+    cpf = f"{rng.randint(100, 999)}.{rng.randint(100, 999)}.{rng.randint(100, 999)}-{rng.randint(10, 99)}"
+    return [
+        'CONTRATO DE PRESTAÇÃO DE SERVIÇOS ADVOCATÍCIOS',
+        '',
+        f'CONTRATANTE: {nome}, brasileiro(a), casado(a), {rng.choice(PROFISSOES)},',
+        f'portador(a) do RG n. {rng.randint(10, 99)}.{rng.randint(100, 999)}.{rng.randint(100, 999)}-{rng.randint(0, 9)} SSP/SP,',
+        f'inscrito(a) no CPF sob o n. {cpf}, residente e domiciliado(a) na',
+        f'{rng.choice(RUAS)}, {rng.randint(1, 2000)}, Centro, São Paulo - SP, CEP 0{rng.randint(1000, 9999)}-000,',
+        f'Telefone: (11) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}.',
+        '',
+        'CONTRATADO: ESCRITÓRIO DE ADVOCACIA, inscrito na OAB/SP, com sede na Av. Paulista, 1000.',
+        '',
+        'CLÁUSULA PRIMEIRA - DO OBJETO',
+        'O presente contrato tem por objeto a prestação de serviços advocatícios em ação acidentária.',
+    ]
+
+def _linhas_texto(rng: random.Random, quantidade: int) -> list[str]:
+    palavras = 'o contratante se obriga a fornecer os documentos necessarios ao andamento do processo judicial'.split()
+    return [' '.join(rng.choice(palavras) for _ in range(12)) for _ in range(quantidade)]
+
+def _pdf(paginas: list[list[str]]) -> bytes:
+    """Monta um PDF mínimo, com Helvetica (WinAnsiEncoding) e uma linha de texto por operador Tj."""
+    objetos = []
+    fonte = 3 + 2 * len(paginas)
+    kids = ' '.join(f'{3 + 2 * i} 0 R' for i in range(len(paginas)))
+    objetos.append(b'<< /Type /Catalog /Pages 2 0 R >>')
+    objetos.append(f'<< /Type /Pages /Kids [{kids}] /Count {len(paginas)} >>'.encode())
+
+    for i, linhas in enumerate(paginas):
+        escapadas = [linha.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') for linha in linhas]
+        stream = ('BT /F1 10 Tf 13 TL 50 800 Td ' + ' '.join(f'({linha}) Tj T*' for linha in escapadas) + ' ET').encode('cp1252')
+        objetos.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents {4 + 2 * i} 0 R '
+                       f'/Resources << /Font << /F1 {fonte} 0 R >> >> >>'.encode())
+        objetos.append(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+
+    objetos.append(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+
+    saida = b'%PDF-1.4\n'
+    offsets = []
+    for i, objeto in enumerate(objetos):
+        offsets.append(len(saida))
+        saida += f'{i + 1} 0 obj\n'.encode() + objeto + b'\nendobj\n'
+
+    xref = len(saida)
+    saida += f'xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n'.encode()
+    saida += b''.join(f'{offset:010d} 00000 n \n'.encode() for offset in offsets)
+    saida += f'trailer\n<< /Size {len(objetos) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF'.encode()
+    return saida
+
+def gerar_corpus(diretorio: str, contratos: int, paginas: int, seed: int = 42) -> list[str]:
+    rng = random.Random(seed)
+    caminhos = []
+    for i in range(contratos):
+        linhas = _linhas_contrato(rng)
+        if i % 4 == 3:
+            # Seção que atravessa a quebra de página
+            primeira = _linhas_texto(rng, 50) + linhas[:6]
+            corpo = [primeira, linhas[6:] + _linhas_texto(rng, 40)]
+        else:
+            corpo = [linhas + _linhas_texto(rng, 40)]
+        corpo += [_linhas_texto(rng, 55) for _ in range(max(0, paginas - len(corpo)))]
+
+        caminho = os.path.join(diretorio, f'contrato_{i:03d}.pdf')
+        with open(caminho, 'wb') as arquivo:
+            arquivo.write(_pdf(corpo))
+        caminhos.append(caminho)
+    return caminhos
+
+def executar_backend(nome: str, caminhos: list[str]) -> dict:
+    """Executado no subprocesso: extrai todas as páginas e as seções de cada contrato com o motor `nome`."""
+    from io import BytesIO
+    from src.infrastructure.utils.pdf_backends import get_backend
+    from src.services.document_extraction.models.arquivo import Arquivo
+    from src.services.document_extraction.documents.contrato import Contrato
+
+    logging.disable(logging.CRITICAL)
+    backend = get_backend(nome)
+    conteudos = []
+    for caminho in caminhos:
+        with open(caminho, 'rb') as arquivo:
+            conteudos.append(arquivo.read())
+
+    paginas = 0
+    inicio = time.perf_counter()
+    for content in conteudos:
+        documento = backend.open(content)
+        for k in range(backend.page_count(documento)):
+            backend.extract_page(documento, k)
+            paginas += 1
+        backend.close(documento)
+    duracao = time.perf_counter() - inicio
+
+    secoes = []
+    for caminho, content in zip(caminhos, conteudos):
+        arquivo = Arquivo(caminho, os.path.basename(caminho), [], 'application/pdf', BytesIO(content))
+        trecho = Contrato._extrair_trecho(arquivo, Contrato.STARTS[0], Contrato.ENDS[0])
+        secoes.append(re.sub(r'\s+', ' ', trecho).strip() if trecho is not None else None)
+
+    try:
+        import resource
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        pico_mb = pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+    except ImportError:
+        pico_mb = None
+
+    return {'backend': backend.nome, 'paginas': paginas, 'duracao': duracao, 'pico_rss_mb': pico_mb, 'secoes': secoes}
+
+def main():
+    from src.infrastructure.utils.pdf_backends import BACKENDS
+
+    parser = argparse.ArgumentParser(description="Benchmark dos motores de extração de texto de PDF")
+    parser.add_argument('--contratos', type=int, default=40)
+    parser.add_argument('--paginas', type=int, default=8)
+    parser.add_argument('--backends', default=','.join(BACKENDS))
+    parser.add_argument('--executar', help=argparse.SUPPRESS)
+    parser.add_argument('--corpus', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.executar:
+        caminhos = sorted(os.path.join(args.corpus, nome) for nome in os.listdir(args.corpus))
+        print(json.dumps(executar_backend(args.executar, caminhos)))
+        return
+
+    with tempfile.TemporaryDirectory() as corpus:
+        gerar_corpus(corpus, args.contratos, args.paginas)
+        print(f"Corpus: {args.contratos} contrato(s) de {args.paginas} página(s)\n")
+
+        resultados = {}
+        for nome in args.backends.split(','):
+            processo = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--executar', nome, '--corpus', corpus],
+                capture_output=True, text=True, env={**os.environ, 'PDF_BACKEND': nome})
+            if processo.returncode != 0:
+                print(f"{nome:<10} falhou: {processo.stderr.strip().splitlines()[-1] if processo.stderr else 'erro'}")
+                continue
+            resultado = json.loads(processo.stdout.strip().splitlines()[-1])
+            if resultado['backend'] != nome:
+                print(f"{nome:<10} não instalado")
+                continue
+            resultados[nome] = resultado
+
+    referencia = resultados.get('pypdf2')
+    print(f"{'motor':<10} {'páginas/s':>10} {'pico RSS':>10} {'seções':>8} {'iguais ao PyPDF2':>18}")
+    for nome, resultado in resultados.items():
+        encontradas = sum(1 for secao in resultado['secoes'] if secao is not None)
+        total = len(resultado['secoes'])
+        iguais = '-'
+        if referencia:
+            iguais = f"{sum(1 for a, b in zip(resultado['secoes'], referencia['secoes']) if a == b)}/{total}"
+        pico = '-' if resultado['pico_rss_mb'] is None else f"{resultado['pico_rss_mb']:.1f}MB"
+        print(f"{nome:<10} {resultado['paginas'] / resultado['duracao']:>10.1f} {pico:>10} "
+              f"{f'{encontradas}/{total}':>8} {iguais:>18}")
+
+if __name__ == "__main__":
+    main()
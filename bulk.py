@@ -0,0 +1,38 @@
+import sys
+import os
+import multiprocessing
+import argparse
+
+sys.path.append(os.path.abspath('.'))
+
+from src.controllers.lote_controller import GeracaoKitLoteController
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="Geração de Kit Acidentário em lote")
+    parser.add_argument('entrada', help="CSV ou JSONL com os links das pastas dos clientes")
+    parser.add_argument('saida', help="Arquivo JSONL onde os resultados serão gravados")
+    parser.add_argument('--concorrencia', type=int, default=None, help="Número de pastas processadas em paralelo")
+    parser.add_argument('--modelos', nargs='+', default=None, help="Modelos gerados para cada pasta (padrão: TEMPLATES_ATIVOS)")
+    parser.add_argument('--regerar', action='store_true',
+                        help="Reaproveita os dados já extraídos das pastas cujos contratos não mudaram (ex.: após alterar o modelo)")
+    args = parser.parse_args()
+
+    try:
+        controller = GeracaoKitLoteController(args.concorrencia, args.modelos, args.regerar)
+        links = controller.ler_links(args.entrada)
+
+        resumo = controller.gerar_kits(links, args.saida)
+
+        print(f"\nKits gerados: {resumo['sucessos']}/{resumo['total']} em {resumo['duracao']}s")
+        print(f"Resultados: {args.saida}\n")
+
+    except KeyboardInterrupt:
+        print("\nOperação cancelada pelo usuário")
+        sys.exit(0)
+    except Exception as e:
+        logger.error(f"Erro fatal: {e}")
+        sys.exit(1)
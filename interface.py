@@ -1,5 +1,6 @@
 import sys
 import os
+import multiprocessing
 import threading
 from datetime import datetime
 
@@ -165,7 +166,17 @@ class KitAcidentarioApp:
         logger.addHandler(text_handler)
 
     def _update_progress(self, value):
-        self.root.after(0, self.progress_bar.set, value)
+        self.root.after(0, self._avancar_progresso, value)
+
+    def _avancar_progresso(self, value):
+        # Mensagens de log e eventos da extração podem chegar fora de ordem; o progresso só avança
+        if value > self.progress_bar.get():
+            self.progress_bar.set(value)
+
+    def _on_progresso(self, etapa, progresso, dados):
+        self._update_progress(progresso)
+        if dados.get('nome_completo'):
+            self.root.after(0, lambda: self.gerar_button.configure(text=f"Processando: {dados['nome_completo']}"))
 
     def _select_all(self, event):
         self.link_entry.select_range(0, 'end')
@@ -223,7 +234,7 @@ class KitAcidentarioApp:
             if not self.controller:
                 self.controller = GeracaoKitController()
 
-            resultado = self.controller.gerar_kit_from_folder(link)
+            resultado = self.controller.gerar_kit_from_folder(link, self._on_progresso)
 
             self.root.after(0, self.progress_bar.set, 0.9)
             self.root.after(0, self._exibir_resultado, resultado)
@@ -263,6 +274,7 @@ class KitAcidentarioApp:
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     root = ctk.CTk()
     app = KitAcidentarioApp(root)
     root.mainloop()
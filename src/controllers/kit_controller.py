@@ -1,8 +1,13 @@
+import time
+from typing import Callable
+from concurrent.futures import ThreadPoolExecutor, Future
 from src.infrastructure.google_api import GoogleApiService
+from src.infrastructure.google_batch import LoteRequisicoesGoogle
+from src.infrastructure.extracoes_pasta import RegistroExtracoes
 from src.services.document_extraction.models.pasta import Pasta
 from src.services.document_extraction.documents.contrato import Contrato
 from src.services.kit_editing.editor_kit import EditorKitAcidentario
-from src.services.kit_editing.campos_editaveis import CamposKitAcidentario
+from src.services.kit_editing.modelos import ModeloDocumento
 from src.utils.logger import setup_logger
 from src.utils.exceptions import (
     GoogleApiConnectionError,
@@ -16,11 +21,78 @@ from src.utils.exceptions import (
 logger = setup_logger(__name__)
 
 class GeracaoKitController:
-    def __init__(self):
+    def __init__(self, agrupar_requisicoes: bool = False, modelos: list[str] = None, concorrencia: int = 1):
         self.google_api = GoogleApiService()
-        self.editor_kit = EditorKitAcidentario(self.google_api)
-
-    def gerar_kit_from_folder(self, folder_link: str) -> dict:
+        lote = LoteRequisicoesGoogle(self.google_api.credenciais) if agrupar_requisicoes else None
+        self.editor_kit = EditorKitAcidentario(self.google_api, lote)
+        # Modelos gerados a partir de uma única extração (padrão: TEMPLATES_ATIVOS ou o kit acidentário)
+        self.modelos = self.editor_kit.registro.selecionar(modelos)
+        # Threads duradouras para as chamadas ao Drive/Docs: cada uma mantém seus clientes do googleapiclient
+        # (e conexões) entre um kit e outro. Cópia e leitura de cada modelo, para `concorrencia` pastas
+        self.executor = ThreadPoolExecutor(max_workers=2 * len(self.modelos) * concorrencia, thread_name_prefix='kit-modelos')
+        # Dados extraídos de cada pasta, reaproveitados enquanto os contratos não mudarem
+        self.extracoes = RegistroExtracoes.from_env()
+
+    def gerar_kit_from_folder(self, folder_link: str, progress_callback: Callable[[str, float, dict], None] = None,
+                              reaproveitar: bool = False) -> dict:
+        """
+        Gera o kit a partir da pasta do cliente. `progress_callback(etapa, progresso, dados)`, se informado,
+        recebe o andamento estruturado: a etapa, a fração concluída (0 a 1) e dados parciais, como o nome do cliente.
+        Com `reaproveitar`, usa os dados da última extração da pasta se os contratos não tiverem mudado.
+        """
+        timings = {}
+        inicio = time.perf_counter()
+        resultado = self._gerar_kit(folder_link, timings, progress_callback, reaproveitar)
+        timings['total'] = round(time.perf_counter() - inicio, 3)
+        resultado['timings'] = timings
+        return resultado
+
+    def _copiar_modelo(self, folder_link: str, modelo: ModeloDocumento, timings: dict) -> str:
+        inicio = time.perf_counter()
+        try:
+            return self.editor_kit.copiar_modelo(folder_link, modelo)
+        finally:
+            timings[f'copia_{modelo.nome}'] = round(time.perf_counter() - inicio, 3)
+
+    def _descartar_copia(self, copia: Future):
+        if not copia.cancelled() and copia.exception() is None:
+            self.editor_kit.excluir_kit(copia.result())
+
+    def _extrair_dados(self, pasta_cliente: Pasta, timings: dict, progress_callback: Callable[[str, float, dict], None] = None) -> Contrato:
+        logger.info("Buscando contratos")
+        contratos = []
+
+        def acompanhar(arquivos):
+            try:
+                for arquivo in arquivos:
+                    contratos.append(arquivo)
+                    yield arquivo
+            finally:
+                arquivos.close()
+
+        # Extrair dados do contrato à medida que os arquivos são baixados
+        inicio = time.perf_counter()
+        try:
+            dados_cliente = Contrato.from_stream(acompanhar(pasta_cliente.iter_file(pasta_cliente.CONTRATO)), progress_callback)
+        except ContratoNaoEncontradoError:
+            if contratos:
+                raise
+            return None
+        timings['extracao'] = round(time.perf_counter() - inicio, 3)
+
+        logger.debug(f"{len(contratos)} contrato(s) analisado(s)")
+        return dados_cliente
+
+    def _gerar_kit(self, folder_link: str, timings: dict, progress_callback: Callable[[str, float, dict], None] = None,
+                   reaproveitar: bool = False) -> dict:
+        """
+        As etapas formam um pequeno grafo de dependências: as cópias dos modelos não dependem dos dados
+        do cliente e rodam em paralelo com a listagem, os downloads e a extração; o preenchimento de cada
+        modelo depende da sua cópia e da extração. Se a geração não for concluída, as cópias são removidas.
+        """
+        executor = self.executor
+        copias = {}
+        concluido = False
         try:
             logger.debug("═" * 60)
             logger.debug("Iniciando processo")
@@ -37,24 +109,29 @@ class GeracaoKitController:
             folder_id = folder_link.split('/')[-1]
             logger.debug(f"ID: {folder_id[:20]}...")
 
+            copias = {modelo.nome: executor.submit(self._copiar_modelo, folder_link, modelo, timings) for modelo in self.modelos}
+            # Os placeholders de cada modelo são lidos em separado, também fora do caminho crítico
+            leituras = {modelo.nome: executor.submit(self.editor_kit.placeholders, modelo.template_id) for modelo in self.modelos}
+
             # Criar objeto Pasta e buscar contratos
             logger.info("Conectando ao Google Drive")
             pasta_cliente = Pasta(folder_id, "Pasta do Cliente")
 
-            logger.info("Buscando contratos")
-            contratos = pasta_cliente.get_file(pasta_cliente.CONTRATO)
-
-            if not contratos:
-                logger.error("Nenhum contrato encontrado")
-                return {
-                    'success': False,
-                    'error': 'Nenhum contrato foi encontrado na pasta do cliente. Verifique se existe um arquivo de contrato válido.'
-                }
-
-            logger.debug(f"{len(contratos)} contrato(s) encontrado(s)")
-
-            # Extrair dados do contrato
-            dados_cliente = Contrato.from_files(contratos)
+            # A impressão digital usa apenas a listagem, que a busca dos contratos reaproveita
+            impressao_digital = pasta_cliente.impressao_digital(pasta_cliente.CONTRATO)
+            registro = self.extracoes.get(folder_id, impressao_digital) if reaproveitar else None
+
+            if registro:
+                logger.info("Contratos inalterados, reaproveitando dados extraídos")
+                dados_cliente = Contrato(registro.get('nome_completo', ''), registro.get('qualificacao', ''))
+            else:
+                dados_cliente = self._extrair_dados(pasta_cliente, timings, progress_callback)
+                if dados_cliente is None:
+                    logger.error("Nenhum contrato encontrado")
+                    return {
+                        'success': False,
+                        'error': 'Nenhum contrato foi encontrado na pasta do cliente. Verifique se existe um arquivo de contrato válido.'
+                    }
 
             if not dados_cliente.nome_completo or not dados_cliente.qualificacao:
                 logger.error("Dados incompletos")
@@ -63,23 +140,37 @@ class GeracaoKitController:
                     'error': 'Dados do cliente estão incompletos. Verifique se o contrato contém nome e qualificação.'
                 }
 
-            # Preparar substituições
-            substituicoes = {
-                CamposKitAcidentario.nome_completo: dados_cliente.nome_completo,
-                CamposKitAcidentario.qualificacao: dados_cliente.qualificacao
-            }
-            logger.debug(f"{len(substituicoes)} campo(s)")
-
-            # Gerar kit
-            kit_id = self.editor_kit.gerar_kit(folder_link, substituicoes)
+            if not registro:
+                self.extracoes.put(folder_id, impressao_digital,
+                                   {'nome_completo': dados_cliente.nome_completo, 'qualificacao': dados_cliente.qualificacao})
+
+            # Preencher, em paralelo, as cópias feitas durante a extração
+            if progress_callback:
+                progress_callback('geracao_kit', 0.9, {'nome_completo': dados_cliente.nome_completo})
+            inicio = time.perf_counter()
+            # Nenhuma tarefa do executor espera outra: cópias e leituras são aguardadas aqui. Uma falha na
+            # leitura dos placeholders interrompe a geração, e as cópias são descartadas com as demais
+            documentos = {modelo.nome: copias[modelo.nome].result() for modelo in self.modelos}
+            placeholders = {modelo.nome: leituras[modelo.nome].result() for modelo in self.modelos}
+            preenchimentos = [executor.submit(self.editor_kit.preencher, documentos[modelo.nome], modelo, dados_cliente,
+                                              placeholders[modelo.nome])
+                              for modelo in self.modelos]
+            for preenchimento in preenchimentos:
+                preenchimento.result()
+            concluido = True
+            timings['geracao_kit'] = round(time.perf_counter() - inicio, 3)
 
             logger.debug("Processo concluído")
 
+            kit_id = documentos[self.modelos[0].nome]
             return {
                 'success': True,
+                'reaproveitado': bool(registro),
                 'nome_cliente': dados_cliente.nome_completo,
                 'kit_id': kit_id,
-                'link': f'https://docs.google.com/document/d/{kit_id}/edit'
+                'link': f'https://docs.google.com/document/d/{kit_id}/edit',
+                'documentos': {nome: {'id': doc_id, 'link': f'https://docs.google.com/document/d/{doc_id}/edit'}
+                               for nome, doc_id in documentos.items()}
             }
 
         except PastaNaoEncontradaError as e:
@@ -132,3 +223,9 @@ class GeracaoKitController:
                 'success': False,
                 'error': f'Erro inesperado: {type(e).__name__}. Entre em contato com o suporte.'
             }
+
+        finally:
+            if not concluido:
+                # Cópias ainda em andamento são removidas assim que terminarem
+                for copia in copias.values():
+                    copia.add_done_callback(self._descartar_copia)
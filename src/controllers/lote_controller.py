@@ -0,0 +1,109 @@
+import os
+import csv
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dotenv import load_dotenv
+from src.controllers.kit_controller import GeracaoKitController
+from src.infrastructure.openai_client import ClienteOpenAI
+from src.utils.logger import setup_logger
+
+load_dotenv()
+
+logger = setup_logger(__name__)
+
+class GeracaoKitLoteController:
+    """
+    Gera kits para várias pastas de clientes de uma vez, processando até
+    `concorrencia` pastas em paralelo e gravando um resultado por pasta em JSONL.
+    """
+
+    def __init__(self, concorrencia: int = None, modelos: list[str] = None, reaproveitar: bool = False):
+        self.concorrencia = concorrencia or int(os.getenv('BULK_CONCURRENCY', '4'))
+        # Regeração após mudança do modelo: extrai novamente apenas as pastas cujos contratos mudaram
+        self.reaproveitar = reaproveitar
+        # Cópias e edições dos kits em andamento são enviadas em requisições batch (GOOGLE_BATCH=0 desativa)
+        self.controller = GeracaoKitController(agrupar_requisicoes=bool(int(os.getenv('GOOGLE_BATCH', '1'))),
+                                               modelos=modelos, concorrencia=self.concorrencia)
+
+    @staticmethod
+    def ler_links(caminho_entrada: str) -> list[str]:
+        """Lê os links das pastas de um CSV (coluna 'link' ou primeira coluna) ou JSONL (chave 'link')."""
+        links = []
+
+        with open(caminho_entrada, encoding='utf-8') as arquivo:
+            if caminho_entrada.lower().endswith('.jsonl'):
+                for linha in arquivo:
+                    linha = linha.strip()
+                    if not linha:
+                        continue
+                    registro = json.loads(linha)
+                    links.append(registro.get('link') or registro.get('folder_link', ''))
+            else:
+                leitor = csv.reader(arquivo)
+                for idx, linha in enumerate(leitor):
+                    if not linha:
+                        continue
+                    if idx == 0 and linha[0].strip().lower() in ('link', 'folder_link'):
+                        continue
+                    links.append(linha[0])
+
+        links = [link.strip() for link in links if link and link.strip()]
+        logger.info(f"{len(links)} pasta(s) lida(s) de {os.path.basename(caminho_entrada)}")
+        return links
+
+    def _processar_pasta(self, folder_link: str) -> dict:
+        inicio = time.perf_counter()
+        try:
+            resultado = self.controller.gerar_kit_from_folder(folder_link, reaproveitar=self.reaproveitar)
+        except Exception as e:
+            logger.error(f"Erro inesperado na pasta {folder_link[-20:]}: {type(e).__name__} - {e}")
+            resultado = {'success': False, 'error': f'{type(e).__name__}: {e}', 'timings': {}}
+
+        return {
+            'folder_link': folder_link,
+            'folder_id': folder_link.rstrip('/').split('/')[-1],
+            'success': resultado.get('success', False),
+            'reaproveitado': resultado.get('reaproveitado', False),
+            'kit_id': resultado.get('kit_id'),
+            'nome_cliente': resultado.get('nome_cliente'),
+            'link': resultado.get('link'),
+            'documentos': resultado.get('documentos', {}),
+            'error': resultado.get('error'),
+            'timings': resultado.get('timings', {}),
+            'duracao': round(time.perf_counter() - inicio, 3),
+        }
+
+    def gerar_kits(self, links: list[str], caminho_saida: str) -> dict:
+        """Processa as pastas em paralelo e grava cada resultado em `caminho_saida` assim que concluído."""
+        logger.info(f"Iniciando geração em lote: {len(links)} pasta(s), concorrência {self.concorrencia}")
+        inicio = time.perf_counter()
+        uso_inicial = ClienteOpenAI.uso_total()
+        sucessos = 0
+        reaproveitados = 0
+
+        with open(caminho_saida, 'a', encoding='utf-8') as saida, \
+                ThreadPoolExecutor(max_workers=self.concorrencia, thread_name_prefix='kit-lote') as executor:
+            futuros = [executor.submit(self._processar_pasta, link) for link in links]
+
+            for concluidos, futuro in enumerate(as_completed(futuros), start=1):
+                registro = futuro.result()
+                saida.write(json.dumps(registro, ensure_ascii=False) + '\n')
+                saida.flush()
+
+                if registro['success']:
+                    sucessos += 1
+                if registro['reaproveitado']:
+                    reaproveitados += 1
+                logger.info(f"[{concluidos}/{len(links)}] {'OK' if registro['success'] else 'ERRO'} - {registro['folder_id']}")
+
+        duracao = round(time.perf_counter() - inicio, 3)
+        uso = {chave: valor - uso_inicial[chave] for chave, valor in ClienteOpenAI.uso_total().items()}
+        logger.info(f"Lote concluído: {sucessos}/{len(links)} kit(s) gerado(s) em {duracao}s")
+        if self.reaproveitar:
+            logger.info(f"{reaproveitados} pasta(s) com dados reaproveitados, {len(links) - reaproveitados} extraída(s) novamente")
+        logger.info(f"Tokens utilizados: {uso['prompt_tokens']} no prompt, {uso['completion_tokens']} na resposta "
+                    f"({uso['requisicoes']} requisição(ões) à IA)")
+
+        return {'total': len(links), 'sucessos': sucessos, 'falhas': len(links) - sucessos, 'duracao': duracao, 'tokens': uso,
+                'reaproveitados': reaproveitados}
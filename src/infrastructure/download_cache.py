@@ -0,0 +1,113 @@
+import os
+import hashlib
+import threading
+from dotenv import load_dotenv
+from src.utils.logger import setup_logger
+
+load_dotenv()
+
+logger = setup_logger(__name__)
+
+class CacheDownloads:
+    """
+    Cache em disco dos arquivos baixados do Drive, endereçado pelo id do arquivo e pela sua versão
+    (md5Checksum ou modifiedTime da listagem). Uma nova versão do arquivo gera uma nova chave, então
+    entradas antigas nunca são servidas; elas apenas envelhecem até serem removidas. O tamanho total
+    é mantido abaixo de `max_bytes`, removendo primeiro as entradas usadas há mais tempo (LRU).
+    """
+
+    def __init__(self, diretorio: str, max_bytes: int):
+        self.diretorio = diretorio
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._tamanho_total = None
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls):
+        diretorio = os.getenv('DRIVE_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'kit_acidentario', 'drive')
+        max_mb = float(os.getenv('DRIVE_CACHE_MAX_MB', '500'))
+        return cls(diretorio, int(max_mb * 1024 * 1024))
+
+    @property
+    def habilitado(self) -> bool:
+        return self.max_bytes > 0
+
+    def _caminho(self, file_id: str, versao: str) -> str:
+        chave = hashlib.sha256(f'{file_id}:{versao}'.encode()).hexdigest()
+        return os.path.join(self.diretorio, chave[:2], chave)
+
+    def _entradas(self) -> list[os.DirEntry]:
+        entradas = []
+        if not os.path.isdir(self.diretorio):
+            return entradas
+        for subdir in os.scandir(self.diretorio):
+            if subdir.is_dir():
+                entradas.extend(e for e in os.scandir(subdir.path) if e.is_file() and not e.name.endswith('.tmp'))
+        return entradas
+
+    def get(self, file_id: str, versao: str) -> bytes:
+        if not self.habilitado or not versao:
+            return None
+
+        caminho = self._caminho(file_id, versao)
+        try:
+            with open(caminho, 'rb') as arquivo:
+                content = arquivo.read()
+            os.utime(caminho)
+            self.hits += 1
+            return content
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except OSError as e:
+            logger.debug(f"Erro ao ler cache de download: {e}")
+            self.misses += 1
+            return None
+
+    def put(self, file_id: str, versao: str, content: bytes):
+        if not self.habilitado or not versao or len(content) > self.max_bytes:
+            return
+
+        caminho = self._caminho(file_id, versao)
+        temporario = f'{caminho}.{threading.get_ident()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            existia = os.path.exists(caminho)
+            with open(temporario, 'wb') as arquivo:
+                arquivo.write(content)
+            os.replace(temporario, caminho)
+        except OSError as e:
+            logger.debug(f"Erro ao gravar cache de download: {e}")
+            return
+
+        with self._lock:
+            if self._tamanho_total is None:
+                self._tamanho_total = sum(e.stat().st_size for e in self._entradas())
+            elif not existia:
+                self._tamanho_total += len(content)
+
+            if self._tamanho_total > self.max_bytes:
+                self._remover_antigos()
+
+    def _remover_antigos(self):
+        entradas = sorted(self._entradas(), key=lambda e: e.stat().st_mtime)
+        self._tamanho_total = sum(e.stat().st_size for e in entradas)
+        removidos = 0
+
+        for entrada in entradas:
+            if self._tamanho_total <= self.max_bytes:
+                break
+            try:
+                tamanho = entrada.stat().st_size
+                os.remove(entrada.path)
+                self._tamanho_total -= tamanho
+                removidos += 1
+            except OSError:
+                pass
+
+        logger.debug(f"Cache de download: {removidos} entrada(s) antiga(s) removida(s)")
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'bytes': self._tamanho_total, 'max_bytes': self.max_bytes}
@@ -0,0 +1,67 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from dotenv import load_dotenv
+from src.utils.logger import setup_logger
+
+load_dotenv()
+
+logger = setup_logger(__name__)
+
+class RegistroExtracoes:
+    """
+    Registro em disco (SQLite) dos dados extraídos de cada pasta de cliente, junto com a impressão digital
+    dos arquivos de origem (IDs e versões dos candidatos a contrato). Permite gerar o kit novamente, quando
+    o modelo muda, sem baixar nem analisar os contratos, desde que os arquivos da pasta não tenham mudado.
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        self._conexao = None
+
+    @classmethod
+    def from_env(cls):
+        caminho = os.getenv('EXTRACOES_PATH') or os.path.join(os.path.expanduser('~'), '.cache', 'kit_acidentario', 'extracoes.sqlite3')
+        return cls(caminho)
+
+    def _conectar(self) -> sqlite3.Connection:
+        if self._conexao is None:
+            os.makedirs(os.path.dirname(self.caminho) or '.', exist_ok=True)
+            self._conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS extracoes_pasta ("
+                "folder_id TEXT PRIMARY KEY, impressao_digital TEXT, dados TEXT, criado_em REAL)")
+            self._conexao.commit()
+        return self._conexao
+
+    def get(self, folder_id: str, impressao_digital: str) -> dict:
+        """Dados extraídos da pasta, ou None se não houver registro ou se os arquivos de origem mudaram."""
+        with self._lock:
+            try:
+                linha = self._conectar().execute(
+                    "SELECT impressao_digital, dados FROM extracoes_pasta WHERE folder_id = ?", (folder_id,)).fetchone()
+            except sqlite3.Error as e:
+                logger.debug(f"Erro ao ler registro de extrações: {e}")
+                return None
+
+        if not linha:
+            logger.debug("Pasta sem extração registrada")
+            return None
+        if linha[0] != impressao_digital:
+            logger.debug("Arquivos de origem alterados desde a última extração")
+            return None
+        return json.loads(linha[1])
+
+    def put(self, folder_id: str, impressao_digital: str, dados: dict):
+        with self._lock:
+            try:
+                conexao = self._conectar()
+                conexao.execute(
+                    "INSERT OR REPLACE INTO extracoes_pasta (folder_id, impressao_digital, dados, criado_em) VALUES (?, ?, ?, ?)",
+                    (folder_id, impressao_digital, json.dumps(dados, ensure_ascii=False), time.time()))
+                conexao.commit()
+            except sqlite3.Error as e:
+                logger.debug(f"Erro ao gravar registro de extrações: {e}")
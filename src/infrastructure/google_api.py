@@ -1,14 +1,21 @@
 import sys
 import os
 import warnings
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+import queue
+import random
+import asyncio
+import threading
+import aiohttp
 from pathlib import Path
+from dotenv import load_dotenv
+from src.infrastructure.http_transport import HttpTransport
+from src.infrastructure.google_credentials import GerenciadorCredenciais
+from src.infrastructure.download_cache import CacheDownloads
 from src.utils.logger import setup_logger
 from src.utils.exceptions import GoogleApiConnectionError
 
+load_dotenv()
+
 warnings.filterwarnings("ignore", message="file_cache is only supported with oauth2client")
 
 logger = setup_logger(__name__)
@@ -23,58 +30,89 @@ def get_writable_path(filename):
         return os.path.join(os.path.dirname(sys.executable), filename)
     return str(Path(__file__).parent / f'tokens/{filename}')
 
+class ResultadoDownload:
+    """Resultado do download de um arquivo: `content` em caso de sucesso ou `error` em caso de falha."""
+
+    def __init__(self, file_id: str, content: bytes = None, error: str = None, status: int = None, tentativas: int = 1,
+                 from_cache: bool = False):
+        self.file_id = file_id
+        self.content = content
+        self.error = error
+        self.status = status
+        self.tentativas = tentativas
+        self.from_cache = from_cache
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
 class GoogleApiService:
     SCOPES = ['https://www.googleapis.com/auth/drive']
     PATH_CREDENTIALS = resource_path('src/infrastructure/tokens/credentials.json')
     PATH_TOKEN = get_writable_path('token.json')
 
-    acess_token = None
-    service = None
-    docs_service = None
+    # Compartilhado por todas as instâncias e threads
+    credenciais = None
+    _lock_conexao = threading.Lock()
+
+    DOWNLOAD_CONCURRENCY = int(os.getenv('DRIVE_DOWNLOAD_CONCURRENCY', '8'))
+    DOWNLOAD_MAX_RETRIES = int(os.getenv('DRIVE_DOWNLOAD_MAX_RETRIES', '4'))
+    DOWNLOAD_BACKOFF_BASE = float(os.getenv('DRIVE_DOWNLOAD_BACKOFF_BASE', '1'))
+    DOWNLOAD_BACKOFF_MAX = float(os.getenv('DRIVE_DOWNLOAD_BACKOFF_MAX', '30'))
+    DOWNLOAD_TIMEOUT = float(os.getenv('DRIVE_DOWNLOAD_TIMEOUT', '120'))
+
+    download_cache = CacheDownloads.from_env()
 
     def __init__(self):
-        if not GoogleApiService.acess_token:
+        if not GoogleApiService.credenciais:
             self._get_acess_token()
 
     def _get_acess_token(self):
-        try:
-            logger.info("Conectando ao Google Drive")
-            creds = None
-
-            if os.path.exists(GoogleApiService.PATH_TOKEN):
-                creds = Credentials.from_authorized_user_file(
-                    GoogleApiService.PATH_TOKEN, GoogleApiService.SCOPES)
+        with GoogleApiService._lock_conexao:
+            if GoogleApiService.credenciais:
+                return
+            try:
+                logger.info("Conectando ao Google Drive")
+                GoogleApiService.credenciais = GerenciadorCredenciais(
+                    GoogleApiService.PATH_CREDENTIALS, GoogleApiService.PATH_TOKEN, GoogleApiService.SCOPES)
 
-            if not creds or not creds.valid:
-                if creds and creds.expired and creds.refresh_token:
-                    creds.refresh(Request())
-                else:
-                    if not os.path.exists(GoogleApiService.PATH_CREDENTIALS):
-                        logger.error("Arquivo credentials.json não encontrado")
-                        raise GoogleApiConnectionError("Arquivo de credenciais não encontrado")
+            except GoogleApiConnectionError:
+                raise
+            except Exception as e:
+                logger.error(f"Erro ao conectar com Google Drive: {e}")
+                raise GoogleApiConnectionError(f"Falha na conexão com Google Drive: {str(e)}")
 
-                    flow = InstalledAppFlow.from_client_secrets_file(
-                        GoogleApiService.PATH_CREDENTIALS, GoogleApiService.SCOPES)
-                    creds = flow.run_local_server(port=0)
+    @property
+    def acess_token(self) -> str:
+        """Token de acesso atual, renovado automaticamente antes de expirar."""
+        return GoogleApiService.credenciais.token
 
-                with open(GoogleApiService.PATH_TOKEN, 'w') as token:
-                    token.write(creds.to_json())
+    @property
+    def service(self):
+        """Cliente do Drive da thread atual."""
+        return GoogleApiService.credenciais.servico('drive', 'v3')
 
-            GoogleApiService.acess_token = creds.token
-            GoogleApiService.service = build('drive', 'v3', credentials=creds)
-            GoogleApiService.docs_service = build('docs', 'v1', credentials=creds)
+    @property
+    def docs_service(self):
+        """Cliente do Docs da thread atual."""
+        return GoogleApiService.credenciais.servico('docs', 'v1')
 
-        except Exception as e:
-            logger.error(f"Erro ao conectar com Google Drive: {e}")
-            raise GoogleApiConnectionError(f"Falha na conexão com Google Drive: {str(e)}")
+    FILE_FIELDS = ('id', 'name', 'parents', 'mimeType')
 
-    def search(self, query, fields="nextPageToken, files(id, name, parents, mimeType)", page_size=1000):
-        import requests
+    def _search_page(self, query: str, fields: str, page_size: int, page_token: str = None) -> dict:
         try:
             logger.debug("Buscando arquivos no Drive")
-            url = f'https://www.googleapis.com/drive/v3/files?q={query}&pageSize={page_size}&fields={fields}'
-            headers = {'Authorization': f'Bearer {GoogleApiService.acess_token}'}
-            response = requests.get(url, headers=headers)
+            url = 'https://www.googleapis.com/drive/v3/files'
+            params = {'q': query, 'pageSize': page_size, 'fields': fields}
+            if page_token:
+                params['pageToken'] = page_token
+            token = self.acess_token
+            response = HttpTransport.session().get(url, params=params, headers={'Authorization': f'Bearer {token}'})
+
+            if response.status_code == 401:
+                # Token revogado ou expirado antes do previsto: renova e tenta mais uma vez
+                GoogleApiService.credenciais.renovar(token)
+                response = HttpTransport.session().get(url, params=params, headers={'Authorization': f'Bearer {self.acess_token}'})
 
             if response.status_code == 404:
                 logger.error(f"Pasta não encontrada no Drive")
@@ -91,7 +129,7 @@ class GoogleApiService:
                 raise GoogleApiConnectionError(f"Erro do Google Drive: {result['error'].get('message', 'Erro desconhecido')}")
 
             files_count = len(result.get('files', []))
-            logger.debug(f"Busca concluída: {files_count} arquivo(s) encontrado(s)")
+            logger.debug(f"Página recebida: {files_count} arquivo(s){' (há mais páginas)' if result.get('nextPageToken') else ''}")
 
             return result
         except GoogleApiConnectionError:
@@ -100,47 +138,208 @@ class GoogleApiService:
             logger.error(f"Erro inesperado ao buscar arquivos: {type(e).__name__} - {e}")
             raise GoogleApiConnectionError(f"Erro ao buscar arquivos no Drive: {str(e)}")
 
-    def batch_download_file(self, file_ids: list[str]) -> list[bytes]:
-        import aiohttp
-        import asyncio
+    def iter_search(self, query: str, fields: tuple[str, ...] = FILE_FIELDS, page_size: int = 1000):
+        """
+        Percorre todas as páginas da busca sob demanda, produzindo os arquivos à medida que chegam.
+        A próxima página é requisitada em segundo plano enquanto a página atual é consumida.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        page_fields = f"nextPageToken, files({', '.join(fields)})"
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='drive-search')
+        try:
+            page = self._search_page(query, page_fields, page_size)
+            while True:
+                next_token = page.get('nextPageToken')
+                next_page = executor.submit(self._search_page, query, page_fields, page_size, next_token) if next_token else None
+
+                yield from page.get('files', [])
+
+                if not next_page:
+                    break
+                page = next_page.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def search(self, query: str, fields: tuple[str, ...] = FILE_FIELDS, page_size: int = 1000) -> dict:
+        files = list(self.iter_search(query, fields, page_size))
+        logger.debug(f"Busca concluída: {len(files)} arquivo(s) encontrado(s)")
+        return {'files': files}
+
+    def pool_stats(self) -> dict:
+        return HttpTransport.stats()
+
+    def _buscar_cache(self, file_ids: list[str], versions: dict[str, str]) -> tuple[dict[str, ResultadoDownload], list[str]]:
+        """Separa os arquivos já presentes no cache local dos que precisam ser baixados."""
+        versions = versions or {}
+        hits = {}
+        for file_id in file_ids:
+            content = GoogleApiService.download_cache.get(file_id, versions.get(file_id))
+            if content is not None:
+                hits[file_id] = ResultadoDownload(file_id, content, status=200, tentativas=0, from_cache=True)
+
+        if hits:
+            logger.debug(f"{len(hits)} arquivo(s) servido(s) pelo cache local")
+        return hits, [file_id for file_id in file_ids if file_id not in hits]
+
+    def _gravar_cache(self, resultado: ResultadoDownload, versions: dict[str, str]):
+        if resultado.success and not resultado.from_cache and versions:
+            GoogleApiService.download_cache.put(resultado.file_id, versions.get(resultado.file_id), resultado.content)
+
+    def download_file(self, file_id: str, version: str = None) -> bytes:
+        download = self.batch_download_file([file_id], versions={file_id: version} if version else None)[0]
+        if not download.success:
+            raise GoogleApiConnectionError(f"Erro ao baixar arquivo do Drive ({download.error})")
+        return download.content
+
+    async def _download(self, session, semaphore: asyncio.Semaphore, file_id: str, index: int, total: int, max_retries: int) -> ResultadoDownload:
+        url = f'https://www.googleapis.com/drive/v3/files/{file_id}?alt=media'
+        timeout = aiohttp.ClientTimeout(total=GoogleApiService.DOWNLOAD_TIMEOUT)
+        erro, status = None, None
+
+        for tentativa in range(max_retries + 1):
+            retry_after = None
+            recusado = False
+            # O token é renovado antes do início dos downloads; aqui só é lido
+            token = self.acess_token
+            async with semaphore:
+                try:
+                    async with session.get(url, headers={'Authorization': f'Bearer {token}'}, timeout=timeout) as r:
+                        status = r.status
+                        if r.status == 200:
+                            content = await r.read()
+                            logger.debug(f"Arquivo {index + 1}/{total} baixado ({len(content)} bytes)")
+                            return ResultadoDownload(file_id, content, status=status, tentativas=tentativa + 1)
+
+                        corpo = await r.text()
+                        erro = f"Status {r.status}"
+                        retry_after = r.headers.get('Retry-After')
+                        recusado = r.status == 401
+                        repetir = recusado or r.status == 429 or r.status >= 500 or (r.status == 403 and 'ateLimitExceeded' in corpo)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    erro = f"{type(e).__name__} - {e}"
+                    repetir = True
 
+            if not repetir or tentativa == max_retries:
+                break
+
+            if recusado:
+                await asyncio.to_thread(GoogleApiService.credenciais.renovar, token)
+                continue
+
+            espera = min(GoogleApiService.DOWNLOAD_BACKOFF_MAX, GoogleApiService.DOWNLOAD_BACKOFF_BASE * 2 ** tentativa)
+            espera = random.uniform(0, espera)
+            if retry_after and retry_after.isdigit():
+                espera = max(espera, float(retry_after))
+            logger.debug(f"Arquivo {index + 1}/{total}: {erro}, nova tentativa em {espera:.1f}s")
+            await asyncio.sleep(espera)
+
+        logger.error(f"Erro ao baixar arquivo {index + 1}/{total}: {erro}")
+        return ResultadoDownload(file_id, error=erro, status=status, tentativas=tentativa + 1)
+
+    def batch_download_file(self, file_ids: list[str], max_concurrency: int = None, max_retries: int = None,
+                            versions: dict[str, str] = None) -> list[ResultadoDownload]:
+        """
+        Baixa os arquivos com no máximo `max_concurrency` downloads simultâneos, repetindo com backoff
+        exponencial (com jitter) em respostas 429/5xx e limite de taxa. Cada arquivo retorna seu próprio
+        ResultadoDownload, na mesma ordem de `file_ids`, para que uma falha não interrompa o lote.
+        Arquivos com versão conhecida em `versions` (md5Checksum/modifiedTime) são servidos pelo cache local.
+        """
         if not file_ids:
             logger.debug("Nenhum arquivo para download")
             return []
 
-        logger.debug(f"Iniciando download de {len(file_ids)} arquivo(s)")
+        hits, file_ids_pendentes = self._buscar_cache(file_ids, versions)
+        if not file_ids_pendentes:
+            return [hits[file_id] for file_id in file_ids]
 
-        async def download(session, file_id, index):
-            url = f'https://www.googleapis.com/drive/v3/files/{file_id}?alt=media'
-            headers = {'Authorization': f'Bearer {GoogleApiService.acess_token}'}
-            try:
-                async with session.get(url, headers=headers) as r:
-                    if r.status != 200:
-                        logger.error(f"Erro ao baixar arquivo: Status {r.status}")
-                        raise GoogleApiConnectionError(f"Erro ao baixar arquivo (Status {r.status})")
-                    content = await r.read()
-                    logger.debug(f"Arquivo {index + 1}/{len(file_ids)} baixado ({len(content)} bytes)")
-                    return content
-            except Exception as e:
-                logger.error(f"Erro ao baixar arquivo: {e}")
-                raise
+        max_concurrency = max_concurrency or GoogleApiService.DOWNLOAD_CONCURRENCY
+        max_retries = GoogleApiService.DOWNLOAD_MAX_RETRIES if max_retries is None else max_retries
+        # Renovação antecipada fora do event loop, para que os downloads não precisem renovar o token
+        self.acess_token
+
+        logger.debug(f"Iniciando download de {len(file_ids_pendentes)} arquivo(s) (até {max_concurrency} simultâneos)")
 
         async def main():
-            async with aiohttp.ClientSession() as session:
-                tasks = [download(session, file_id, idx) for idx, file_id in enumerate(file_ids)]
-                return await asyncio.gather(*tasks)
+            session = await HttpTransport.aio_session()
+            semaphore = asyncio.Semaphore(max_concurrency)
+            tasks = [self._download(session, semaphore, file_id, idx, len(file_ids_pendentes), max_retries)
+                     for idx, file_id in enumerate(file_ids_pendentes)]
+            return await asyncio.gather(*tasks)
 
         try:
-            loop = asyncio.get_running_loop()
-            import nest_asyncio
-            nest_asyncio.apply()
-        except RuntimeError:
-            pass
+            baixados = HttpTransport.run(main())
+        except Exception as e:
+            logger.error(f"Erro ao baixar arquivos: {type(e).__name__} - {e}")
+            raise GoogleApiConnectionError(f"Erro ao baixar arquivos do Drive: {str(e)}")
+
+        for resultado in baixados:
+            self._gravar_cache(resultado, versions)
+            hits[resultado.file_id] = resultado
+        result = [hits[file_id] for file_id in file_ids]
+
+        falhas = sum(1 for r in result if not r.success)
+        logger.debug(f"Download concluído: {len(result) - falhas} arquivo(s){f', {falhas} falha(s)' if falhas else ''}")
+        return result
 
+    def iter_download_file(self, file_ids: list[str], max_concurrency: int = None, max_retries: int = None,
+                           versions: dict[str, str] = None):
+        """
+        Baixa os arquivos como `batch_download_file`, mas produz cada ResultadoDownload assim que
+        ele fica pronto, em ordem de conclusão. Encerrar o gerador cancela os downloads pendentes.
+        """
+        if not file_ids:
+            logger.debug("Nenhum arquivo para download")
+            return
+
+        hits, file_ids = self._buscar_cache(file_ids, versions)
+        yield from hits.values()
+        if not file_ids:
+            return
+
+        max_concurrency = max_concurrency or GoogleApiService.DOWNLOAD_CONCURRENCY
+        max_retries = GoogleApiService.DOWNLOAD_MAX_RETRIES if max_retries is None else max_retries
+        # Renovação antecipada fora do event loop, para que os downloads não precisem renovar o token
+        self.acess_token
+        resultados = queue.Queue()
+        fim = object()
+
+        logger.debug(f"Iniciando download de {len(file_ids)} arquivo(s) (até {max_concurrency} simultâneos)")
+
+        async def main():
+            try:
+                session = await HttpTransport.aio_session()
+                semaphore = asyncio.Semaphore(max_concurrency)
+                tasks = [asyncio.ensure_future(self._download(session, semaphore, file_id, idx, len(file_ids), max_retries))
+                         for idx, file_id in enumerate(file_ids)]
+                try:
+                    for proximo in asyncio.as_completed(tasks):
+                        resultados.put(await proximo)
+                finally:
+                    for task in tasks:
+                        task.cancel()
+            finally:
+                resultados.put(fim)
+
+        future = HttpTransport.submit(main())
+        recebidos = 0
         try:
-            result = asyncio.run(main())
-            logger.debug(f"Download concluído: {len(result)} arquivo(s)")
-            return result
+            while True:
+                resultado = resultados.get()
+                if resultado is fim:
+                    break
+                recebidos += 1
+                self._gravar_cache(resultado, versions)
+                yield resultado
+
+            if future.exception():
+                raise future.exception()
+        except GeneratorExit:
+            if recebidos < len(file_ids):
+                logger.debug(f"Cancelando {len(file_ids) - recebidos} download(s) pendente(s)")
+            raise
         except Exception as e:
             logger.error(f"Erro ao baixar arquivos: {type(e).__name__} - {e}")
             raise GoogleApiConnectionError(f"Erro ao baixar arquivos do Drive: {str(e)}")
+        finally:
+            future.cancel()
@@ -0,0 +1,128 @@
+import os
+import time
+import random
+import threading
+from concurrent.futures import Future
+from dotenv import load_dotenv
+from googleapiclient.errors import HttpError
+from src.infrastructure.google_credentials import GerenciadorCredenciais
+from src.utils.logger import setup_logger
+
+load_dotenv()
+
+logger = setup_logger(__name__)
+
+class LoteRequisicoesGoogle:
+    """
+    Agrupa requisições do googleapiclient (Drive e Docs) de vários jobs em requisições batch
+    (`new_batch_http_request`), uma por serviço, com até `MAX_POR_LOTE` sub-requisições. Uma thread
+    envia o lote quando ele enche ou quando a requisição mais antiga espera `JANELA` segundos.
+
+    `enviar` devolve um Future por requisição, resolvido pelo callback do batch. Sub-requisições que
+    falham com erro temporário (429/5xx, limite de taxa) voltam para a fila após um backoff exponencial
+    (com jitter) e seguem num lote seguinte, sem atrasar as requisições dos demais jobs. Os lotes são
+    enviados pelo cliente HTTP da própria thread de envio, e não pelo das threads que criaram as requisições.
+    """
+
+    MAX_POR_LOTE = int(os.getenv('GOOGLE_BATCH_MAX', '100'))
+    JANELA = float(os.getenv('GOOGLE_BATCH_JANELA_MS', '50')) / 1000
+    MAX_RETRIES = int(os.getenv('GOOGLE_BATCH_MAX_RETRIES', '4'))
+    BACKOFF_BASE = float(os.getenv('GOOGLE_BATCH_BACKOFF_BASE', '1'))
+    BACKOFF_MAX = float(os.getenv('GOOGLE_BATCH_BACKOFF_MAX', '30'))
+
+    def __init__(self, credenciais: GerenciadorCredenciais):
+        self.credenciais = credenciais
+        self._condicao = threading.Condition()
+        self._pendentes = {}
+        self._inicio = None
+        threading.Thread(target=self._executar, name='google-batch', daemon=True).start()
+
+    def enviar(self, service, requisicao) -> Future:
+        """Agenda a requisição (ainda não executada) no próximo lote da API do `service` de origem."""
+        futuro = Future()
+        self._enfileirar(service, requisicao, futuro, 0)
+        return futuro
+
+    def _enfileirar(self, service, requisicao, futuro: Future, tentativa: int):
+        # Cada thread tem seu próprio cliente; requisições da mesma API (Drive ou Docs) vão no mesmo lote
+        chave = service._baseUrl
+        with self._condicao:
+            _, itens = self._pendentes.setdefault(chave, (service, []))
+            itens.append((requisicao, futuro, tentativa))
+            if self._inicio is None:
+                self._inicio = time.monotonic()
+            self._condicao.notify()
+
+    def _repetir(self, service, requisicao, futuro: Future, tentativa: int, erro: Exception):
+        """Devolve a requisição à fila após o backoff, ou falha o Future se as tentativas acabaram."""
+        if tentativa >= self.MAX_RETRIES:
+            futuro.set_exception(erro)
+            return
+        espera = random.uniform(0, min(self.BACKOFF_MAX, self.BACKOFF_BASE * 2 ** tentativa))
+        temporizador = threading.Timer(espera, self._enfileirar, (service, requisicao, futuro, tentativa + 1))
+        temporizador.daemon = True
+        temporizador.start()
+
+    def _executar(self):
+        while True:
+            with self._condicao:
+                while not self._pendentes:
+                    self._condicao.wait()
+
+                while True:
+                    cheio = any(len(itens) >= self.MAX_POR_LOTE for _, itens in self._pendentes.values())
+                    restante = self._inicio + self.JANELA - time.monotonic()
+                    if cheio or restante <= 0:
+                        break
+                    self._condicao.wait(restante)
+
+                lotes = []
+                for chave, (service, itens) in list(self._pendentes.items()):
+                    lotes.append((service, itens[:self.MAX_POR_LOTE]))
+                    if len(itens) > self.MAX_POR_LOTE:
+                        self._pendentes[chave] = (service, itens[self.MAX_POR_LOTE:])
+                    else:
+                        del self._pendentes[chave]
+                # O que sobrou de um lote cheio é enviado em seguida, sem esperar outra janela
+                if not self._pendentes:
+                    self._inicio = None
+
+            for service, itens in lotes:
+                self._enviar_lote(service, itens)
+
+    @staticmethod
+    def _erro_temporario(erro: Exception) -> bool:
+        if not isinstance(erro, HttpError):
+            return False
+        status = erro.resp.status
+        return status == 429 or status >= 500 or (status == 403 and b'ateLimitExceeded' in (erro.content or b''))
+
+    def _enviar_lote(self, service, itens: list[tuple]):
+        repetir = []
+
+        def callback(request_id, resposta, erro):
+            requisicao, futuro, tentativa = itens[int(request_id)]
+            if erro is None:
+                futuro.set_result(resposta)
+            elif self._erro_temporario(erro):
+                repetir.append((requisicao, futuro, tentativa, erro))
+            else:
+                futuro.set_exception(erro)
+
+        lote = service.new_batch_http_request(callback=callback)
+        for idx, (requisicao, _, _) in enumerate(itens):
+            lote.add(requisicao, request_id=str(idx))
+
+        try:
+            lote.execute(http=self.credenciais.http())
+        except Exception as e:
+            logger.debug(f"Erro ao enviar lote de requisições: {type(e).__name__} - {e}")
+            repetidos = {id(futuro) for _, futuro, _, _ in repetir}
+            repetir += [(requisicao, futuro, tentativa, e) for requisicao, futuro, tentativa in itens
+                        if not futuro.done() and id(futuro) not in repetidos]
+
+        logger.debug(f"Lote de {len(itens)} requisição(ões) enviado"
+                     f"{f', {len(repetir)} voltam para a fila' if repetir else ''}")
+
+        for requisicao, futuro, tentativa, erro in repetir:
+            self._repetir(service, requisicao, futuro, tentativa, erro)
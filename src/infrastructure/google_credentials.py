@@ -0,0 +1,149 @@
+import os
+import threading
+from datetime import datetime, timezone, timedelta
+from google.auth import credentials as google_credentials
+from google.oauth2.credentials import Credentials
+from google_auth_oauthlib.flow import InstalledAppFlow
+from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+from googleapiclient.http import build_http
+from dotenv import load_dotenv
+from src.infrastructure.http_transport import HttpTransport
+from src.utils.logger import setup_logger
+from src.utils.exceptions import GoogleApiConnectionError
+
+load_dotenv()
+
+logger = setup_logger(__name__)
+
+class _CredenciaisCompartilhadas(google_credentials.Credentials):
+    """
+    Credenciais entregues ao AuthorizedHttp de cada thread. Não guardam token próprio: cada requisição
+    usa o token atual do GerenciadorCredenciais, e um 401 pede a renovação do token que foi recusado.
+    """
+
+    def __init__(self, gerenciador: 'GerenciadorCredenciais'):
+        super().__init__()
+        self._gerenciador = gerenciador
+        self._local = threading.local()
+
+    @property
+    def valid(self) -> bool:
+        return True
+
+    def refresh(self, request):
+        self._gerenciador.renovar(getattr(self._local, 'token', None))
+
+    def apply(self, headers, token=None):
+        # Também chamado diretamente pelo googleapiclient ao serializar cada sub-requisição de um batch
+        self._local.token = token or self._gerenciador.token
+        headers['authorization'] = f'Bearer {self._local.token}'
+
+    def before_request(self, request, method, url, headers):
+        self.apply(headers)
+
+class GerenciadorCredenciais:
+    """
+    Credenciais OAuth compartilhadas por todas as threads. O token é renovado antes de expirar (com
+    `MARGEM_RENOVACAO` segundos de antecedência), uma única vez mesmo com vários jobs simultâneos: a
+    renovação é feita sob um lock, e quem chega depois usa o token já renovado.
+
+    Os clientes do googleapiclient (httplib2) não são thread-safe, então cada thread recebe seus próprios
+    serviços, construídos sobre um AuthorizedHttp que usa o token compartilhado.
+    """
+
+    MARGEM_RENOVACAO = float(os.getenv('GOOGLE_TOKEN_MARGEM_RENOVACAO', '300'))
+
+    def __init__(self, path_credentials: str, path_token: str, scopes: list[str]):
+        self.path_credentials = path_credentials
+        self.path_token = path_token
+        self.scopes = scopes
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._compartilhadas = _CredenciaisCompartilhadas(self)
+        self._creds = self._carregar()
+
+    def _carregar(self) -> Credentials:
+        creds = None
+
+        if os.path.exists(self.path_token):
+            creds = Credentials.from_authorized_user_file(self.path_token, self.scopes)
+
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                creds.refresh(Request(HttpTransport.session()))
+            else:
+                if not os.path.exists(self.path_credentials):
+                    logger.error("Arquivo credentials.json não encontrado")
+                    raise GoogleApiConnectionError("Arquivo de credenciais não encontrado")
+
+                flow = InstalledAppFlow.from_client_secrets_file(self.path_credentials, self.scopes)
+                creds = flow.run_local_server(port=0)
+
+            self._salvar(creds)
+
+        return creds
+
+    def _salvar(self, creds: Credentials):
+        try:
+            with open(self.path_token, 'w') as token:
+                token.write(creds.to_json())
+        except OSError as e:
+            logger.debug(f"Erro ao gravar token: {e}")
+
+    def _expira_em(self) -> float:
+        """Segundos até o token expirar (None se a expiração não for conhecida)."""
+        if not self._creds.expiry:
+            return None
+        agora = datetime.now(timezone.utc).replace(tzinfo=None)
+        return (self._creds.expiry - agora) / timedelta(seconds=1)
+
+    def _precisa_renovar(self) -> bool:
+        expira_em = self._expira_em()
+        return not self._creds.token or (expira_em is not None and expira_em < self.MARGEM_RENOVACAO)
+
+    def renovar(self, token_recusado: str = None):
+        """
+        Renova o token. Com `token_recusado`, a renovação só acontece se ele ainda for o token atual,
+        evitando que vários 401 simultâneos disparem uma renovação cada.
+        """
+        with self._lock:
+            if token_recusado is not None and self._creds.token != token_recusado:
+                return
+            if token_recusado is None and not self._precisa_renovar():
+                return
+
+            logger.debug("Renovando token de acesso do Google")
+            try:
+                self._creds.refresh(Request(HttpTransport.session()))
+            except Exception as e:
+                expira_em = self._expira_em()
+                if token_recusado is None and expira_em is not None and expira_em > 0:
+                    # O token atual ainda vale; a renovação é tentada de novo na próxima requisição
+                    logger.warning(f"Erro ao renovar token do Google: {type(e).__name__} - {e}")
+                    return
+                logger.error(f"Erro ao renovar token do Google: {type(e).__name__} - {e}")
+                raise GoogleApiConnectionError(f"Falha ao renovar o acesso ao Google Drive: {str(e)}")
+
+            self._salvar(self._creds)
+
+    @property
+    def token(self) -> str:
+        """Token de acesso válido, renovado antes de expirar."""
+        if self._precisa_renovar():
+            self.renovar()
+        return self._creds.token
+
+    def http(self) -> AuthorizedHttp:
+        """AuthorizedHttp da thread atual."""
+        if getattr(self._local, 'http', None) is None:
+            self._local.http = AuthorizedHttp(self._compartilhadas, http=build_http())
+        return self._local.http
+
+    def servico(self, nome: str, versao: str):
+        """Serviço do googleapiclient da thread atual, construído na primeira vez que a thread o usa."""
+        servicos = self._local.__dict__.setdefault('servicos', {})
+        if (nome, versao) not in servicos:
+            servicos[(nome, versao)] = build(nome, versao, http=self.http(), cache_discovery=False)
+        return servicos[(nome, versao)]
@@ -0,0 +1,141 @@
+import os
+import atexit
+import asyncio
+import threading
+import concurrent.futures
+from collections import defaultdict
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+from src.utils.logger import setup_logger
+
+load_dotenv()
+
+logger = setup_logger(__name__)
+
+class HttpTransport:
+    """
+    Camada de transporte HTTP compartilhada pelas chamadas ao Drive e à OpenAI.
+
+    Mantém uma única `requests.Session` (chamadas síncronas) e uma única `aiohttp.ClientSession`
+    (chamadas assíncronas) com pool de conexões e keep-alive, evitando um novo handshake TCP+TLS
+    a cada requisição. As corrotinas rodam num event loop dedicado, para que a sessão assíncrona
+    possa ser reaproveitada entre chamadas e entre threads.
+
+    HTTP/2 não é suportado por requests/aiohttp; as conexões usam HTTP/1.1 com keep-alive.
+    """
+
+    POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', '10'))
+    POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '20'))
+    KEEPALIVE_TIMEOUT = float(os.getenv('HTTP_KEEPALIVE_TIMEOUT', '60'))
+
+    _lock = threading.Lock()
+    _session = None
+    _loop = None
+    _aio_session = None
+    _aio_stats = defaultdict(lambda: {'conexoes_criadas': 0, 'conexoes_reutilizadas': 0, 'requisicoes': 0})
+
+    @classmethod
+    def session(cls) -> requests.Session:
+        if cls._session is None:
+            with cls._lock:
+                if cls._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=cls.POOL_CONNECTIONS, pool_maxsize=cls.POOL_MAXSIZE)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    cls._session = session
+                    logger.debug(f"Sessão HTTP criada (pool {cls.POOL_CONNECTIONS}x{cls.POOL_MAXSIZE})")
+        return cls._session
+
+    @classmethod
+    def _get_loop(cls) -> asyncio.AbstractEventLoop:
+        if cls._loop is None:
+            with cls._lock:
+                if cls._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name='http-transport', daemon=True).start()
+                    cls._loop = loop
+        return cls._loop
+
+    @classmethod
+    def submit(cls, coro) -> concurrent.futures.Future:
+        """Agenda a corrotina no event loop compartilhado sem aguardar o resultado."""
+        return asyncio.run_coroutine_threadsafe(coro, cls._get_loop())
+
+    @classmethod
+    def run(cls, coro, timeout: float = None):
+        """Executa a corrotina no event loop compartilhado e aguarda o resultado na thread atual."""
+        future = cls.submit(coro)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    @classmethod
+    async def aio_session(cls) -> aiohttp.ClientSession:
+        """Sessão assíncrona compartilhada; deve ser chamada dentro do event loop do transporte."""
+        if cls._aio_session is None or cls._aio_session.closed:
+            trace = aiohttp.TraceConfig()
+            trace.on_connection_create_end.append(cls._on_connection_create)
+            trace.on_connection_reuseconn.append(cls._on_connection_reuse)
+            trace.on_request_start.append(cls._on_request_start)
+
+            connector = aiohttp.TCPConnector(
+                limit=cls.POOL_CONNECTIONS * cls.POOL_MAXSIZE,
+                limit_per_host=cls.POOL_MAXSIZE,
+                keepalive_timeout=cls.KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=300,
+            )
+            cls._aio_session = aiohttp.ClientSession(connector=connector, trace_configs=[trace])
+            logger.debug(f"Sessão HTTP assíncrona criada (limite {cls.POOL_MAXSIZE} por host)")
+        return cls._aio_session
+
+    @classmethod
+    async def _on_request_start(cls, session, context, params):
+        context.host = params.url.host
+        cls._aio_stats[context.host]['requisicoes'] += 1
+
+    @classmethod
+    async def _on_connection_create(cls, session, context, params):
+        cls._aio_stats[getattr(context, 'host', None)]['conexoes_criadas'] += 1
+
+    @classmethod
+    async def _on_connection_reuse(cls, session, context, params):
+        cls._aio_stats[getattr(context, 'host', None)]['conexoes_reutilizadas'] += 1
+
+    @classmethod
+    def stats(cls) -> dict:
+        """Estatísticas dos pools de conexão por host (conexões criadas, reutilizadas e requisições)."""
+        sync_stats = {}
+        if cls._session is not None:
+            adapter = cls._session.get_adapter('https://')
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                sync_stats[pool.host] = {
+                    'conexoes_criadas': pool.num_connections,
+                    'requisicoes': pool.num_requests,
+                }
+
+        return {
+            'sync': sync_stats,
+            'async': {host: dict(valores) for host, valores in cls._aio_stats.items()},
+            'pool_maxsize': cls.POOL_MAXSIZE,
+        }
+
+    @classmethod
+    def close(cls):
+        if cls._aio_session is not None and cls._loop is not None and not cls._loop.is_closed():
+            try:
+                cls.run(cls._aio_session.close(), timeout=5)
+            except Exception:
+                pass
+        if cls._session is not None:
+            cls._session.close()
+
+atexit.register(HttpTransport.close)
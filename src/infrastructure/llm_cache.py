@@ -0,0 +1,149 @@
+import sys
+import os
+sys.path.append('.')
+
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+from dotenv import load_dotenv
+from src.utils.logger import setup_logger
+
+load_dotenv()
+
+logger = setup_logger(__name__)
+
+class CacheLlm:
+    """
+    Cache em disco (SQLite) das respostas da extração via IA, endereçado pelo hash do trecho do contrato
+    (com espaços normalizados), pela versão do prompt e pelo modelo. Mudar o prompt ou o modelo gera
+    novas chaves. As entradas expiram após `ttl` segundos, e as já lidas ficam também em memória.
+
+    Invalidação: python -m src.infrastructure.llm_cache --limpar [--modelo M] [--versao-prompt V] [--expirados]
+    """
+
+    def __init__(self, caminho: str, ttl: float):
+        self.caminho = caminho
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conexao = None
+        self._memoria = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls):
+        caminho = os.getenv('LLM_CACHE_PATH') or os.path.join(os.path.expanduser('~'), '.cache', 'kit_acidentario', 'llm.sqlite3')
+        ttl_dias = float(os.getenv('LLM_CACHE_TTL_DIAS', '30'))
+        return cls(caminho, ttl_dias * 24 * 60 * 60)
+
+    @property
+    def habilitado(self) -> bool:
+        return self.ttl > 0
+
+    @staticmethod
+    def chave(trecho: str, versao_prompt: str, modelo: str) -> str:
+        normalizado = re.sub(r'\s+', ' ', trecho).strip()
+        return hashlib.sha256(f'{versao_prompt}\0{modelo}\0{normalizado}'.encode()).hexdigest()
+
+    def _conectar(self) -> sqlite3.Connection:
+        if self._conexao is None:
+            os.makedirs(os.path.dirname(self.caminho) or '.', exist_ok=True)
+            self._conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS extracoes ("
+                "chave TEXT PRIMARY KEY, modelo TEXT, versao_prompt TEXT, dados TEXT, criado_em REAL)")
+            self._conexao.commit()
+        return self._conexao
+
+    def get(self, chave: str) -> dict:
+        if not self.habilitado:
+            return None
+
+        with self._lock:
+            agora = time.time()
+            entrada = self._memoria.get(chave)
+            if entrada is None:
+                try:
+                    linha = self._conectar().execute(
+                        "SELECT dados, criado_em FROM extracoes WHERE chave = ?", (chave,)).fetchone()
+                except sqlite3.Error as e:
+                    logger.debug(f"Erro ao ler cache da IA: {e}")
+                    linha = None
+                if linha:
+                    entrada = (json.loads(linha[0]), linha[1])
+                    self._memoria[chave] = entrada
+
+            if entrada is None or agora - entrada[1] > self.ttl:
+                self._memoria.pop(chave, None)
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return dict(entrada[0])
+
+    def put(self, chave: str, dados: dict, versao_prompt: str = None, modelo: str = None):
+        if not self.habilitado:
+            return
+
+        with self._lock:
+            criado_em = time.time()
+            self._memoria[chave] = (dict(dados), criado_em)
+            try:
+                conexao = self._conectar()
+                conexao.execute(
+                    "INSERT OR REPLACE INTO extracoes (chave, modelo, versao_prompt, dados, criado_em) VALUES (?, ?, ?, ?, ?)",
+                    (chave, modelo, versao_prompt, json.dumps(dados, ensure_ascii=False), criado_em))
+                conexao.commit()
+            except sqlite3.Error as e:
+                logger.debug(f"Erro ao gravar cache da IA: {e}")
+
+    def invalidar(self, modelo: str = None, versao_prompt: str = None, apenas_expirados: bool = False) -> int:
+        """Remove as entradas do modelo e/ou versão do prompt informados (todas, se nenhum filtro). Retorna quantas foram removidas."""
+        condicoes, parametros = [], []
+        if modelo:
+            condicoes.append("modelo = ?")
+            parametros.append(modelo)
+        if versao_prompt:
+            condicoes.append("versao_prompt = ?")
+            parametros.append(versao_prompt)
+        if apenas_expirados:
+            condicoes.append("criado_em < ?")
+            parametros.append(time.time() - self.ttl)
+
+        where = f" WHERE {' AND '.join(condicoes)}" if condicoes else ""
+        with self._lock:
+            self._memoria.clear()
+            conexao = self._conectar()
+            removidas = conexao.execute(f"DELETE FROM extracoes{where}", parametros).rowcount
+            conexao.commit()
+
+        logger.info(f"Cache da IA: {removidas} entrada(s) removida(s)")
+        return removidas
+
+    def stats(self) -> dict:
+        with self._lock:
+            try:
+                total = self._conectar().execute("SELECT COUNT(*) FROM extracoes").fetchone()[0]
+            except sqlite3.Error:
+                total = None
+        return {'hits': self.hits, 'misses': self.misses, 'entradas': total, 'caminho': self.caminho}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gerencia o cache das extrações via IA")
+    parser.add_argument('--limpar', action='store_true', help="Remove entradas do cache")
+    parser.add_argument('--modelo', help="Remove apenas as entradas deste modelo")
+    parser.add_argument('--versao-prompt', help="Remove apenas as entradas desta versão do prompt")
+    parser.add_argument('--expirados', action='store_true', help="Remove apenas as entradas expiradas")
+    args = parser.parse_args()
+
+    cache = CacheLlm.from_env()
+    if args.limpar:
+        removidas = cache.invalidar(args.modelo, args.versao_prompt, args.expirados)
+        print(f"{removidas} entrada(s) removida(s) de {cache.caminho}")
+    else:
+        stats = cache.stats()
+        print(f"{stats['entradas']} entrada(s) em {stats['caminho']}")
@@ -0,0 +1,232 @@
+import os
+import json
+import time
+import random
+import asyncio
+import threading
+from typing import Callable
+import aiohttp
+from dotenv import load_dotenv
+from src.infrastructure.http_transport import HttpTransport
+from src.utils.logger import setup_logger
+from src.utils.exceptions import OpenAiApiError
+
+load_dotenv()
+
+logger = setup_logger(__name__)
+
+class ContadorTokens:
+    """
+    Conta tokens offline. Usa o tiktoken (codificação do modelo) se estiver instalado; caso contrário,
+    uma estimativa conservadora de ~3 caracteres por token, adequada para texto em português.
+    """
+
+    _codificacoes = {}
+
+    @classmethod
+    def contar(cls, texto: str, modelo: str = 'gpt-4o-mini') -> int:
+        if modelo not in cls._codificacoes:
+            try:
+                import tiktoken
+                try:
+                    cls._codificacoes[modelo] = tiktoken.encoding_for_model(modelo)
+                except KeyError:
+                    cls._codificacoes[modelo] = tiktoken.get_encoding('o200k_base')
+            except ImportError:
+                cls._codificacoes[modelo] = None
+
+        codificacao = cls._codificacoes[modelo]
+        if codificacao is None:
+            return len(texto) // 3 + 1
+        return len(codificacao.encode(texto))
+
+class LimitadorTaxa:
+    """
+    Token bucket com dois saldos, requisições/minuto e tokens/minuto, repostos continuamente.
+    Quem não tem saldo espera, em ordem de chegada, até que haja o suficiente. Um limite 0 desativa
+    o respectivo saldo. Deve ser usado dentro do event loop do HttpTransport.
+    """
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requisicoes = float(rpm)
+        self._tokens = float(tpm)
+        self._atualizado = time.monotonic()
+        self._lock = None
+
+    def _repor(self):
+        agora = time.monotonic()
+        decorrido = agora - self._atualizado
+        self._atualizado = agora
+        if self.rpm:
+            self._requisicoes = min(self.rpm, self._requisicoes + self.rpm * decorrido / 60)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + self.tpm * decorrido / 60)
+
+    async def adquirir(self, tokens: int):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # Uma requisição maior que o próprio limite nunca caberia no saldo
+        tokens = min(tokens, self.tpm) if self.tpm else tokens
+
+        async with self._lock:
+            while True:
+                self._repor()
+                falta_requisicoes = 1 - self._requisicoes if self.rpm else 0
+                falta_tokens = tokens - self._tokens if self.tpm else 0
+                if falta_requisicoes <= 0 and falta_tokens <= 0:
+                    self._requisicoes -= 1
+                    self._tokens -= tokens
+                    return
+
+                espera = max(falta_requisicoes * 60 / self.rpm if self.rpm else 0,
+                             falta_tokens * 60 / self.tpm if self.tpm else 0)
+                logger.debug(f"Limite de taxa da OpenAI: aguardando {espera:.1f}s")
+                await asyncio.sleep(espera)
+
+    def ajustar(self, tokens: int):
+        """Corrige o saldo de tokens pela diferença entre o consumo real e o estimado."""
+        if self.tpm:
+            self._tokens -= tokens
+
+class ClienteOpenAI:
+    """
+    Cliente assíncrono de chat completions sobre a sessão aiohttp do HttpTransport. Antes de cada
+    envio, estima o custo em tokens e aguarda saldo no LimitadorTaxa compartilhado (OPENAI_RPM e
+    OPENAI_TPM); respostas 429/5xx e falhas de conexão são repetidas com backoff exponencial (com
+    jitter), respeitando o Retry-After.
+    """
+
+    URL = 'https://api.openai.com/v1/chat/completions'
+
+    RPM = int(os.getenv('OPENAI_RPM', '500'))
+    TPM = int(os.getenv('OPENAI_TPM', '200000'))
+    MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', '4'))
+    BACKOFF_BASE = float(os.getenv('OPENAI_BACKOFF_BASE', '1'))
+    BACKOFF_MAX = float(os.getenv('OPENAI_BACKOFF_MAX', '30'))
+    TIMEOUT = float(os.getenv('OPENAI_TIMEOUT', '30'))
+    # Tokens reservados para a resposta quando o payload não informa max_tokens
+    TOKENS_RESPOSTA = int(os.getenv('OPENAI_TOKENS_RESPOSTA', '512'))
+
+    limitador = LimitadorTaxa(RPM, TPM)
+
+    # Uso acumulado no processo, informado pelas respostas da API
+    _lock_uso = threading.Lock()
+    _uso = {'requisicoes': 0, 'prompt_tokens': 0, 'completion_tokens': 0}
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+
+    @classmethod
+    def estimar_tokens(cls, payload: dict) -> int:
+        """Tokens do prompt, contados pelo ContadorTokens, mais os reservados para a resposta."""
+        tokens = 0
+        for mensagem in payload.get('messages', []):
+            conteudo = mensagem.get('content')
+            partes = conteudo if isinstance(conteudo, list) else [conteudo]
+            texto = ''.join(parte.get('text', '') if isinstance(parte, dict) else str(parte or '') for parte in partes)
+            tokens += ContadorTokens.contar(texto, payload.get('model', 'gpt-4o-mini'))
+        return tokens + payload.get('max_tokens', cls.TOKENS_RESPOSTA)
+
+    @classmethod
+    def _registrar_uso(cls, uso: dict):
+        with cls._lock_uso:
+            cls._uso['requisicoes'] += 1
+            cls._uso['prompt_tokens'] += uso.get('prompt_tokens', 0)
+            cls._uso['completion_tokens'] += uso.get('completion_tokens', 0)
+
+    @classmethod
+    def uso_total(cls) -> dict:
+        with cls._lock_uso:
+            return dict(cls._uso)
+
+    @staticmethod
+    def _mensagem_erro(corpo: str) -> str:
+        try:
+            return json.loads(corpo).get('error', {}).get('message') or corpo[:200]
+        except (ValueError, AttributeError):
+            return corpo[:200]
+
+    async def _ler_stream(self, r, ao_receber: Callable[[str], None] = None) -> dict:
+        """
+        Lê a resposta em modo `stream` (server-sent events), chamando `ao_receber` com o conteúdo
+        acumulado a cada trecho. Retorna a resposta no mesmo formato do modo sem stream.
+        """
+        partes = []
+        uso = {}
+        async for linha in r.content:
+            linha = linha.decode('utf-8').strip()
+            if not linha.startswith('data:'):
+                continue
+            dado = linha[len('data:'):].strip()
+            if dado == '[DONE]':
+                break
+
+            evento = json.loads(dado)
+            if 'error' in evento:
+                raise OpenAiApiError(evento['error'].get('message', 'Erro desconhecido'), r.status)
+            uso = evento.get('usage') or uso
+
+            for escolha in evento.get('choices') or []:
+                trecho = (escolha.get('delta') or {}).get('content')
+                if not trecho:
+                    continue
+                partes.append(trecho)
+                if ao_receber:
+                    try:
+                        ao_receber(''.join(partes))
+                    except Exception as e:
+                        logger.debug(f"Erro no acompanhamento da resposta: {type(e).__name__} - {e}")
+
+        return {'choices': [{'message': {'role': 'assistant', 'content': ''.join(partes)}}], 'usage': uso}
+
+    async def chat(self, payload: dict, ao_receber: Callable[[str], None] = None) -> dict:
+        """
+        Envia a requisição de chat completion. Com `payload['stream']`, a resposta é lida à medida que é
+        gerada e `ao_receber` recebe o conteúdo parcial; o retorno tem o mesmo formato nos dois modos.
+        """
+        estimativa = self.estimar_tokens(payload)
+        session = await HttpTransport.aio_session()
+        headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+        timeout = aiohttp.ClientTimeout(total=ClienteOpenAI.TIMEOUT)
+
+        for tentativa in range(ClienteOpenAI.MAX_RETRIES + 1):
+            await ClienteOpenAI.limitador.adquirir(estimativa)
+            retry_after = None
+            try:
+                async with session.post(ClienteOpenAI.URL, headers=headers, json=payload, timeout=timeout) as r:
+                    if r.status == 200:
+                        if payload.get('stream'):
+                            resposta = await self._ler_stream(r, ao_receber)
+                        else:
+                            resposta = await r.json(content_type=None)
+                        uso = resposta.get('usage') or {}
+                        if uso.get('total_tokens'):
+                            ClienteOpenAI.limitador.ajustar(uso['total_tokens'] - estimativa)
+                            ClienteOpenAI._registrar_uso(uso)
+                        return resposta
+
+                    corpo = await r.text()
+                    erro = OpenAiApiError(self._mensagem_erro(corpo), r.status)
+                    retry_after = r.headers.get('Retry-After')
+                    # Cota esgotada também responde 429, mas não adianta repetir
+                    repetir = (r.status == 429 and 'insufficient_quota' not in corpo) or r.status >= 500
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                erro = e
+                repetir = True
+
+            if not repetir or tentativa == ClienteOpenAI.MAX_RETRIES:
+                raise erro
+
+            espera = random.uniform(0, min(ClienteOpenAI.BACKOFF_MAX, ClienteOpenAI.BACKOFF_BASE * 2 ** tentativa))
+            try:
+                espera = max(espera, float(retry_after)) if retry_after else espera
+            except ValueError:
+                pass
+            logger.debug(f"OpenAI: {type(erro).__name__} {getattr(erro, 'status', '') or ''}, nova tentativa em {espera:.1f}s")
+            await asyncio.sleep(espera)
+
+    def completar(self, payload: dict, ao_receber: Callable[[str], None] = None) -> dict:
+        """Versão síncrona de `chat`, executada no event loop compartilhado do HttpTransport."""
+        return HttpTransport.run(self.chat(payload, ao_receber))
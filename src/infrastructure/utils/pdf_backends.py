@@ -0,0 +1,145 @@
+import os
+import threading
+from io import BytesIO, StringIO
+from dotenv import load_dotenv
+from src.utils.logger import setup_logger
+
+load_dotenv()
+
+logger = setup_logger(__name__)
+
+class PdfBackend:
+    """
+    Interface dos motores de extração de texto de PDF. `open` recebe os bytes do arquivo e devolve
+    um documento opaco, que é passado para `page_count`, `extract_page` e `close`.
+    """
+
+    nome = None
+
+    def open(self, content: bytes):
+        raise NotImplementedError
+
+    def page_count(self, documento) -> int:
+        raise NotImplementedError
+
+    def extract_page(self, documento, page: int) -> str:
+        raise NotImplementedError
+
+    def close(self, documento):
+        pass
+
+class PyPDF2Backend(PdfBackend):
+    nome = 'pypdf2'
+
+    def __init__(self):
+        from PyPDF2 import PdfReader
+        self._reader_cls = PdfReader
+
+    def open(self, content: bytes):
+        return self._reader_cls(BytesIO(content))
+
+    def page_count(self, documento) -> int:
+        return len(documento.pages)
+
+    def extract_page(self, documento, page: int) -> str:
+        return documento.pages[page].extract_text()
+
+class PdfiumBackend(PdfBackend):
+    """
+    Usa o PDFium (pypdfium2), motor nativo do Chromium. O PDFium não é thread-safe, então as
+    chamadas são serializadas dentro do processo; o paralelismo vem do ExtratorPdf (processos).
+    """
+
+    nome = 'pypdfium2'
+    _lock = threading.Lock()
+
+    def __init__(self):
+        import pypdfium2
+        self._pdfium = pypdfium2
+
+    def open(self, content: bytes):
+        with self._lock:
+            return self._pdfium.PdfDocument(content)
+
+    def page_count(self, documento) -> int:
+        with self._lock:
+            return len(documento)
+
+    def extract_page(self, documento, page: int) -> str:
+        with self._lock:
+            pagina = documento[page]
+            textpage = pagina.get_textpage()
+            try:
+                return textpage.get_text_range().replace('\r\n', '\n') + '\n'
+            finally:
+                textpage.close()
+                pagina.close()
+
+    def close(self, documento):
+        with self._lock:
+            documento.close()
+
+class PdfminerBackend(PdfBackend):
+    """
+    Usa o pdfminer.six agrupando apenas caracteres em linhas (boxes_flow=None), sem ordenar blocos.
+    O modo totalmente sem layout (laparams=None) é mais rápido, mas não produz quebras de linha, e a
+    busca pelas seções depende de '\nCLÁUSULA'.
+    """
+
+    nome = 'pdfminer'
+
+    def __init__(self):
+        from pdfminer.pdfparser import PDFParser
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfpage import PDFPage
+        from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        self._laparams = LAParams(boxes_flow=None)
+        self._parser_cls = PDFParser
+        self._document_cls = PDFDocument
+        self._page_cls = PDFPage
+        self._resource_manager_cls = PDFResourceManager
+        self._interpreter_cls = PDFPageInterpreter
+        self._converter_cls = TextConverter
+
+    def open(self, content: bytes):
+        documento = self._document_cls(self._parser_cls(BytesIO(content)))
+        return list(self._page_cls.create_pages(documento))
+
+    def page_count(self, documento) -> int:
+        return len(documento)
+
+    def extract_page(self, documento, page: int) -> str:
+        saida = StringIO()
+        recursos = self._resource_manager_cls(caching=True)
+        conversor = self._converter_cls(recursos, saida, laparams=self._laparams)
+        try:
+            self._interpreter_cls(recursos, conversor).process_page(documento[page])
+            return saida.getvalue()
+        finally:
+            conversor.close()
+
+BACKENDS = {
+    PyPDF2Backend.nome: PyPDF2Backend,
+    PdfiumBackend.nome: PdfiumBackend,
+    PdfminerBackend.nome: PdfminerBackend,
+}
+
+_instancias = {}
+
+def get_backend(nome: str = None) -> PdfBackend:
+    """Retorna o motor configurado em PDF_BACKEND (padrão: pypdf2), recorrendo ao PyPDF2 se não estiver instalado."""
+    nome = (nome or os.getenv('PDF_BACKEND') or PyPDF2Backend.nome).lower()
+
+    if nome not in _instancias:
+        if nome not in BACKENDS:
+            logger.warning(f"Motor de PDF '{nome}' desconhecido, usando {PyPDF2Backend.nome}")
+            return get_backend(PyPDF2Backend.nome)
+        try:
+            _instancias[nome] = BACKENDS[nome]()
+        except ImportError:
+            logger.warning(f"Motor de PDF '{nome}' não está instalado, usando {PyPDF2Backend.nome}")
+            return get_backend(PyPDF2Backend.nome)
+
+    return _instancias[nome]
@@ -0,0 +1,122 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, Future, as_completed
+from dotenv import load_dotenv
+from src.infrastructure.utils.pdf_backends import get_backend
+from src.utils.logger import setup_logger
+
+load_dotenv()
+
+logger = setup_logger(__name__)
+
+def _extrair_paginas(content: bytes, inicio: int, fim: int, backend_nome: str = None) -> tuple[int, list[str]]:
+    """Executado no processo de trabalho: retorna o total de páginas e os textos das páginas [inicio, fim)."""
+    backend = get_backend(backend_nome)
+    documento = backend.open(content)
+    try:
+        total = backend.page_count(documento)
+        return total, [backend.extract_page(documento, k) for k in range(inicio, min(fim, total))]
+    finally:
+        backend.close(documento)
+
+class ExtratorPdf:
+    """
+    Extrai o texto de vários PDFs em paralelo num ProcessPoolExecutor, já que a extração de texto
+    é CPU-bound e não se beneficia de threads. Cada arquivo é uma tarefa; PDFs longos são divididos
+    em tarefas de `PAGINAS_POR_TAREFA` páginas. Com um único arquivo curto, extrai na própria thread.
+    """
+
+    WORKERS = int(os.getenv('PDF_WORKERS') or os.cpu_count() or 1)
+    PAGINAS_POR_TAREFA = int(os.getenv('PDF_PAGINAS_POR_TAREFA', '8'))
+
+    _lock = threading.Lock()
+    _executor = None
+
+    @classmethod
+    def executor(cls) -> ProcessPoolExecutor:
+        if cls._executor is None:
+            with cls._lock:
+                if cls._executor is None:
+                    logger.debug(f"Iniciando pool de extração de PDF ({cls.WORKERS} processo(s))")
+                    # 'spawn': o pool é criado quando o processo já tem outras threads rodando, e um fork
+                    # herdaria locks (logging, transporte HTTP) possivelmente presos por elas
+                    cls._executor = ProcessPoolExecutor(max_workers=cls.WORKERS,
+                                                        mp_context=multiprocessing.get_context('spawn'))
+        return cls._executor
+
+    @classmethod
+    def _extrair_serial(cls, conteudos: list[bytes], pages: int = None, backend_nome: str = None) -> list[tuple[int, list[str]]]:
+        resultados = []
+        for content in conteudos:
+            try:
+                resultados.append(_extrair_paginas(content, 0, pages or float('inf'), backend_nome))
+            except Exception as e:
+                logger.debug(f"Erro ao extrair texto do arquivo: {e}")
+                resultados.append(None)
+        return resultados
+
+    @classmethod
+    def submeter(cls, content: bytes, pages: int = None) -> Future:
+        """
+        Agenda a extração das `pages` primeiras páginas de um PDF e retorna o Future com a tupla
+        (total de páginas, textos das páginas). Sem processos de trabalho, extrai na própria thread.
+        """
+        backend_nome = get_backend().nome
+        if cls.WORKERS <= 1:
+            futuro = Future()
+            futuro.set_result(cls._extrair_serial([content], pages, backend_nome)[0])
+            return futuro
+        return cls.executor().submit(_extrair_paginas, content, 0, pages or float('inf'), backend_nome)
+
+    @classmethod
+    def extrair(cls, conteudos: list[bytes], pages: int = None) -> list[tuple[int, list[str]]]:
+        """
+        Extrai o texto das `pages` primeiras páginas (todas, se não informado) de cada PDF.
+        Retorna, para cada arquivo, uma tupla (total de páginas, textos das páginas), ou None se falhou.
+        """
+        if not conteudos:
+            return []
+
+        backend_nome = get_backend().nome
+        if cls.WORKERS <= 1 or (len(conteudos) == 1 and pages and pages <= cls.PAGINAS_POR_TAREFA):
+            return cls._extrair_serial(conteudos, pages, backend_nome)
+
+        executor = cls.executor()
+        totais = [None] * len(conteudos)
+        textos = [dict() for _ in conteudos]
+        falhas = set()
+
+        # Primeira rodada: o bloco inicial de cada arquivo, que também informa o total de páginas
+        primeiro_bloco = min(pages or cls.PAGINAS_POR_TAREFA, cls.PAGINAS_POR_TAREFA)
+        futuros = {executor.submit(_extrair_paginas, content, 0, primeiro_bloco, backend_nome): (idx, 0)
+                   for idx, content in enumerate(conteudos)}
+        restantes = {}
+
+        for futuro in as_completed(futuros):
+            idx, inicio = futuros[futuro]
+            try:
+                totais[idx], textos[idx][inicio] = futuro.result()
+            except Exception as e:
+                logger.debug(f"Erro ao extrair texto do arquivo {idx + 1}: {e}")
+                falhas.add(idx)
+                continue
+
+            # PDFs longos: as páginas seguintes são divididas entre os processos
+            limite = min(pages or totais[idx], totais[idx])
+            for bloco in range(primeiro_bloco, limite, cls.PAGINAS_POR_TAREFA):
+                fim = min(bloco + cls.PAGINAS_POR_TAREFA, limite)
+                restantes[executor.submit(_extrair_paginas, conteudos[idx], bloco, fim, backend_nome)] = (idx, bloco)
+
+        for futuro in as_completed(restantes):
+            idx, inicio = restantes[futuro]
+            try:
+                _, textos[idx][inicio] = futuro.result()
+            except Exception as e:
+                logger.debug(f"Erro ao extrair texto do arquivo {idx + 1}: {e}")
+                falhas.add(idx)
+
+        return [
+            None if idx in falhas else (totais[idx], [texto for inicio in sorted(blocos) for texto in blocos[inicio]])
+            for idx, blocos in enumerate(textos)
+        ]
@@ -2,7 +2,7 @@ import unicodedata
 import re
 import os
 from io import BytesIO
-from PyPDF2 import PdfReader
+from src.infrastructure.utils.pdf_backends import get_backend
 from time import time
 
 class StringManipulation:
@@ -58,9 +58,14 @@ class StringManipulation:
 
     def extract_text_from_pdf(self, file: BytesIO, pages: int = None) -> str:
         try:
-            reader = PdfReader(file)
-            num_pages = pages if pages else len(reader.pages)
-            return ''.join([reader.pages[k].extract_text() for k in range(min(num_pages, len(reader.pages)))])
+            backend = get_backend()
+            documento = backend.open(file.getvalue())
+            try:
+                total = backend.page_count(documento)
+                num_pages = pages if pages else total
+                return ''.join([backend.extract_page(documento, k) for k in range(min(num_pages, total))])
+            finally:
+                backend.close(documento)
         except Exception as e:
             print(f"Erro ao extrair texto do arquivo: {e}")
             return ""
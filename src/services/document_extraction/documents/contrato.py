@@ -4,12 +4,17 @@ sys.path.append('.')
 
 import os
 import json
-import requests
+import asyncio
+import aiohttp
+from typing import Iterable, Callable
 from dotenv import load_dotenv
 from src.services.document_extraction.models.arquivo import Arquivo
+from src.infrastructure.openai_client import ClienteOpenAI, ContadorTokens
+from src.services.document_extraction.documents.extrator_local import ExtratorQualificacao
+from src.infrastructure.llm_cache import CacheLlm
 from src.infrastructure.utils.string_manipulation import StringManipulation as utils
 from src.utils.logger import setup_logger
-from src.utils.exceptions import ContratoNaoEncontradoError, DadosInvalidosError
+from src.utils.exceptions import ContratoNaoEncontradoError, DadosInvalidosError, OpenAiApiError
 
 load_dotenv()
 
@@ -39,63 +44,189 @@ class Contrato:
         self.nome_completo = nome_completo
         self.qualificacao = qualificacao
 
+    MODELO = "gpt-4o-mini"
+    # Incrementar sempre que o PROMPT ou a compactação mudarem, para que o cache não devolva respostas antigas
+    PROMPT_VERSION = "4"
+
+    PROMPT = """\
+# Objetivos
+- Analise o contrato de honorários advocatícios abaixo e informe os dados de qualificação do(a) contratante dos serviços advocatícios, no formato nome completo e qualificação (nacionalidade, estado civil, profissão, número do RG, número do CPF, endereço completo, incluindo CEP e o número de celular e/ou de telefone do contratante).
+
+# Instruções
+- A qualificação deve conter os dados na seguinte ordem: nome completo, nacionalidade, estado civil, profissão, número do RG, número do CPF, endereço completo (incluindo CEP) e o número de celular e/ou de telefone.
+- Se algum dado de qualificação não for encontrado, ignore na qualificação.
+- Após extrair os dados, SEMPRE verifique se há algum erro (exemplo de erro: confundir o nome do bairro com o nome da cidade, palavras grudadas sem espaço) e corrija o erro se houver.
+- Não inclua informações adicionais ou explicações na sua resposta nem caracteres extras além do JSON.
+
+- O endereço deve ser o endereço do(a) contratante dos serviços advocatícios, e não o endereço do advogado ou escritório de advocacia.
+- O endereço deve ser formatado de modo que apenas a primeira letra de cada palavra esteja em maiúscula, e o restante em minúscula. Exemplo: "R. São Paulo, 123, Centro, São Paulo - SP".
+- Abreviações de logradouro devem ter espaço após o ponto: "R. " (não "R."), "Av. " (não "Av."), "Tv. " (não "Tv."). SEMPRE verifique se há espaço após a abreviação.
+
+- O número de celular/telefone deve ser o número do(a) contratante dos serviços advocatícios, e não o número do advogado ou escritório de advocacia.
+- O número de celular/telefone deve ser formatado APENAS com DDD entre parênteses, SEM o código do país. Use o formato "Telefone: (xx) xxxxx-xxxx". Exemplo: "Telefone: (11) 91234-5678".
+- NÃO use "cel./tel.", use apenas "Telefone:".
+- NÃO inclua o prefixo +55 do país.
+
+- Responda no formato JSON, com as chaves "nome_completo" e "qualificacao".
+
+# Exemplo de resposta correta:
+{{"nome_completo":"JOÃO DA SILVA SOUSA", "qualificacao":"brasileiro, solteiro, engenheiro, portador do RG n. 12.345.678-9 SSP/SP, inscrito no CPF sob o n. 123.456.789-00, residente e domiciliado na R. das Flores, 123, Centro, São Paulo - SP, CEP 01000-000, Telefone: (11) 91234-5678"}}
+
+# Texto do contrato de honorários para análise:
+<contrato>
+{contrato}
+</contrato>
+"""
+
+    # Limite de caracteres do trecho enviado à IA (a qualificação fica no início da seção)
+    MAX_CARACTERES_TRECHO = int(os.getenv('OPENAI_MAX_CARACTERES_TRECHO', '6000'))
+
+    llm_cache = CacheLlm.from_env()
+
+    # Lê a resposta da IA em stream quando há um acompanhamento de progresso (0 desativa)
+    OPENAI_STREAM = bool(int(os.getenv('OPENAI_STREAM', '1')))
+    # Tamanho aproximado da resposta, usado para estimar o progresso durante o stream
+    TAMANHO_RESPOSTA = 400
+
+    # Tenta extrair os dados localmente (regex + validação) antes de chamar a IA (0 desativa)
+    EXTRACAO_LOCAL = bool(int(os.getenv('EXTRACAO_LOCAL', '1')))
+
+    # Numeração de página explícita: "Página 2", "Pág. 2 de 5", "2/5", "2 de 5"
+    NUMERO_PAGINA = re.compile(r'p[áa]g(ina|\.)?\s*\d+(\s*(de|/)\s*\d+)?|\d+\s*(de|/)\s*\d+', re.IGNORECASE)
+
+    # Linhas do topo e da base de cada página em que se procuram cabeçalhos e rodapés
+    LINHAS_BORDA = 3
+
     @staticmethod
-    def _fetch(contrato: str) -> dict:
-        logger.debug("Enviando contrato para extração via IA")
+    def _normalizar_linha(linha: str) -> str:
+        return re.sub(r'[ \t]+', ' ', linha).strip()
+
+    @staticmethod
+    def _cabecalhos_rodapes(paginas: list[str]) -> set[str]:
+        """
+        Linhas que se repetem no topo ou na base de pelo menos duas páginas. Linhas repetidas no meio
+        das páginas, como os rótulos "Endereço:" e "Telefone:" de cada parte, não são consideradas.
+        """
+        topos, bases = {}, {}
+        for pagina in paginas:
+            linhas = [linha for linha in map(Contrato._normalizar_linha, pagina.split('\n'))
+                      if linha and not linha.isdigit() and not Contrato.NUMERO_PAGINA.fullmatch(linha)]
+            for contagem, borda in ((topos, linhas[:Contrato.LINHAS_BORDA]), (bases, linhas[-Contrato.LINHAS_BORDA:])):
+                for linha in set(borda):
+                    contagem[linha] = contagem.get(linha, 0) + 1
+        return {linha for contagem in (topos, bases) for linha, vezes in contagem.items() if vezes > 1}
 
-        TEMPLATE = f'''
-            # Objetivos
-                - Analise o contrato de honorários advocatícios abaixo e informe os dados de qualificação do(a) contratante dos serviços advocatícios, no formato nome completo e qualificação (nacionalidade, estado civil, profissão, número do RG, número do CPF, endereço completo, incluindo CEP e o número de celular e/ou de telefone do contratante).
+    @staticmethod
+    def _remover_cabecalhos(trecho: str, paginas: list[str]) -> str:
+        """Mantém só a primeira ocorrência, no trecho, dos cabeçalhos e rodapés das `paginas` de onde ele saiu."""
+        cabecalhos = Contrato._cabecalhos_rodapes(paginas)
+        if not cabecalhos:
+            return trecho
+
+        mantidas = []
+        vistas = set()
+        for linha in trecho.split('\n'):
+            normalizada = Contrato._normalizar_linha(linha)
+            if normalizada in cabecalhos:
+                if normalizada in vistas:
+                    continue
+                vistas.add(normalizada)
+            mantidas.append(linha)
+        return '\n'.join(mantidas)
 
-            # Instruções
-                - A qualificação deve conter os dados na seguinte ordem: nome completo, nacionalidade, estado civil, profissão, número do RG, número do CPF, endereço completo (incluindo CEP) e o número de celular e/ou de telefone.
-                - Se algum dado de qualificação não for encontrado, ignore na qualificação.
-                - Após extrair os dados, SEMPRE verifique se há algum erro (exemplo de erro: confundir o nome do bairro com o nome da cidade, palavras grudadas sem espaço) e corrija o erro se houver.
-                - Não inclua informações adicionais ou explicações na sua resposta nem caracteres extras além do JSON.
+    @staticmethod
+    def _compactar(trecho: str) -> str:
+        """
+        Reduz o trecho enviado à IA: junta palavras hifenizadas na quebra de linha, remove números de
+        página, normaliza os espaços e limita o tamanho a MAX_CARACTERES_TRECHO. Cabeçalhos e rodapés
+        já foram removidos em `_extrair_trecho`, que conhece as páginas.
+        """
+        # Entre letras, a palavra hifenizada é unida; entre dígitos (CPF, CEP, RG, telefone), o hífen faz
+        # parte do número e só a quebra de linha é removida
+        trecho = re.sub(r'([^\W\d_])-[ \t]*\n\s*([^\W\d_])', r'\1\2', trecho)
+        trecho = re.sub(r'(\d)-[ \t]*\n\s*(\d)', r'\1-\2', trecho)
+        linhas = [Contrato._normalizar_linha(linha) for linha in trecho.split('\n')]
+
+        # Linhas só com um número são numeração de página apenas quando formam uma sequência (1, 2, 3...)
+        # ao longo das páginas; um número isolado, como o número de uma casa, é mantido
+        numeros = [int(linha) for linha in linhas if linha.isdigit()]
+        paginacao = len(numeros) > 1 and all(b == a + 1 for a, b in zip(numeros, numeros[1:]))
+
+        mantidas = [linha for linha in linhas
+                    if linha and not Contrato.NUMERO_PAGINA.fullmatch(linha) and not (paginacao and linha.isdigit())]
+        return ' '.join(mantidas)[:Contrato.MAX_CARACTERES_TRECHO]
 
-                - O endereço deve ser o endereço do(a) contratante dos serviços advocatícios, e não o endereço do advogado ou escritório de advocacia.
-                - O endereço deve ser formatado de modo que apenas a primeira letra de cada palavra esteja em maiúscula, e o restante em minúscula. Exemplo: "R. São Paulo, 123, Centro, São Paulo - SP".
-                - Abreviações de logradouro devem ter espaço após o ponto: "R. " (não "R."), "Av. " (não "Av."), "Tv. " (não "Tv."). SEMPRE verifique se há espaço após a abreviação.
+    @staticmethod
+    def _acompanhar_resposta(progress_callback: Callable[[str, float, dict], None]) -> Callable[[str], None]:
+        """
+        Cria o acompanhamento da resposta em stream: repassa o progresso estimado pelo tamanho recebido
+        e, assim que o campo "nome_completo" se fecha no JSON parcial, o nome do cliente.
+        """
+        estado = {'nome': None, 'progresso': 0}
+
+        def ao_receber(parcial: str):
+            dados = {}
+            if estado['nome'] is None:
+                nome = re.search(r'"nome_completo"\s*:\s*"((?:[^"\\]|\\.)*)"', parcial)
+                if nome:
+                    estado['nome'] = json.loads(f'"{nome.group(1)}"')
+                    dados['nome_completo'] = estado['nome']
+                    logger.info(f"Cliente identificado: {estado['nome']}")
+
+            progresso = round(0.7 + 0.2 * min(1.0, len(parcial) / Contrato.TAMANHO_RESPOSTA), 2)
+            if dados or progresso > estado['progresso']:
+                estado['progresso'] = progresso
+                progress_callback('extracao_ia', progresso, dados)
+
+        return ao_receber
 
-                - O número de celular/telefone deve ser o número do(a) contratante dos serviços advocatícios, e não o número do advogado ou escritório de advocacia.
-                - O número de celular/telefone deve ser formatado APENAS com DDD entre parênteses, SEM o código do país. Use o formato "Telefone: (xx) xxxxx-xxxx". Exemplo: "Telefone: (11) 91234-5678".
-                - NÃO use "cel./tel.", use apenas "Telefone:".
-                - NÃO inclua o prefixo +55 do país.
+    @staticmethod
+    def _fetch(contrato: str, progress_callback: Callable[[str, float, dict], None] = None) -> dict:
+        tamanho_original = len(contrato)
+        contrato = Contrato._compactar(contrato)
+        logger.debug(f"Trecho compactado: {tamanho_original} -> {len(contrato)} caracteres")
+
+        chave = Contrato.llm_cache.chave(contrato, Contrato.PROMPT_VERSION, Contrato.MODELO)
+        dados = Contrato.llm_cache.get(chave)
+        if dados:
+            logger.info(f"Dados extraídos (cache): {dados.get('nome_completo', 'N/A')}")
+            return dados
 
-                - Responda no formato JSON, com as chaves "nome_completo" e "qualificacao".
+        if Contrato.EXTRACAO_LOCAL:
+            dados = ExtratorQualificacao.extrair(contrato)
+            if dados:
+                logger.info(f"Dados extraídos localmente: {dados['nome_completo']}")
+                logger.debug(f"Qualificação: {dados['qualificacao'][:100]}...")
+                return dados
+            logger.debug("Extração local incompleta, usando IA")
 
-            # Exemplo de resposta correta:
-            {{"nome_completo":"JOÃO DA SILVA SOUSA", "qualificacao":"brasileiro, solteiro, engenheiro, portador do RG n. 12.345.678-9 SSP/SP, inscrito no CPF sob o n. 123.456.789-00, residente e domiciliado na R. das Flores, 123, Centro, São Paulo - SP, CEP 01000-000, Telefone: (11) 91234-5678"}}
+        logger.debug("Enviando contrato para extração via IA")
 
-            # Texto do contrato de honorários para análise:
-            <contrato>
-            {contrato}
-            </contrato>
-        '''
         api_key = os.getenv('OPENAI_API_KEY')
         if not api_key:
             logger.error("OPENAI_API_KEY não configurada")
             raise ContratoNaoEncontradoError("Chave da API OpenAI não configurada. Configure a variável OPENAI_API_KEY no arquivo .env")
 
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
+        prompt = Contrato.PROMPT.format(contrato=contrato)
         payload = {
-            "model": "gpt-4o-mini",
-            "messages": [{"role": "user", "content": [{"type": "text", "text": TEMPLATE}]}],
+            "model": Contrato.MODELO,
+            "messages": [{"role": "user", "content": [{"type": "text", "text": prompt}]}],
             "response_format": { "type": "json_object" }
         }
+        ao_receber = None
+        if Contrato.OPENAI_STREAM and progress_callback:
+            payload['stream'] = True
+            payload['stream_options'] = {"include_usage": True}
+            ao_receber = Contrato._acompanhar_resposta(progress_callback)
 
         try:
             logger.debug("Enviando requisição para OpenAI API")
-            r = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json=payload, timeout=30)
-
-            if r.status_code != 200:
-                logger.error(f"Erro na API OpenAI (Status {r.status_code})")
-                raise ContratoNaoEncontradoError(f"Erro ao processar contrato via IA (Status {r.status_code})")
+            logger.debug(f"Prompt: ~{ContadorTokens.contar(prompt, Contrato.MODELO)} token(s)")
+            response_json = ClienteOpenAI(api_key).completar(payload, ao_receber)
 
-            response_json = r.json()
+            uso = response_json.get('usage') or {}
+            if uso:
+                logger.info(f"Tokens utilizados: {uso.get('prompt_tokens', 0)} no prompt, {uso.get('completion_tokens', 0)} na resposta")
 
             if 'error' in response_json:
                 error_msg = response_json['error'].get('message', 'Erro desconhecido')
@@ -118,15 +249,20 @@ class Contrato:
             logger.info(f"Dados extraídos: {dados.get('nome_completo', 'N/A')}")
             logger.debug(f"Qualificação: {dados.get('qualificacao', 'N/A')[:100]}...")
 
+            Contrato.llm_cache.put(chave, dados, Contrato.PROMPT_VERSION, Contrato.MODELO)
+
             return dados
 
         except json.JSONDecodeError as e:
             logger.error(f"Erro ao decodificar JSON: {e}")
             raise ContratoNaoEncontradoError("Erro ao processar resposta da IA (formato inválido)")
-        except requests.Timeout:
+        except OpenAiApiError as e:
+            logger.error(f"Erro na API OpenAI (Status {e.status}): {e}")
+            raise ContratoNaoEncontradoError(f"Erro ao processar contrato via IA (Status {e.status})")
+        except asyncio.TimeoutError:
             logger.error("Timeout ao conectar com OpenAI")
             raise ContratoNaoEncontradoError("Tempo esgotado ao processar contrato. Tente novamente.")
-        except requests.RequestException as e:
+        except aiohttp.ClientError as e:
             logger.error(f"Erro de conexão com OpenAI: {e}")
             raise ContratoNaoEncontradoError("Erro de conexão ao processar contrato. Verifique sua internet.")
         except (ContratoNaoEncontradoError, DadosInvalidosError):
@@ -135,77 +271,101 @@ class Contrato:
             logger.error(f"Erro inesperado: {type(e).__name__} - {e}")
             raise ContratoNaoEncontradoError(f"Erro ao processar contrato: {str(e)}")
 
+    STARTS = [r'CONTRATANTE', r'CONTRATANTE|inventariante|OUTORGANTES']
+    ENDS = [r'\nCLÁUSULA', r'\nCLÁUSULA|nomeia|OUTORGADOS']
+    PAGINAS_SECAO = 4
+
+    @staticmethod
+    def _secao_completa(texto: str, start: str, end: str) -> bool:
+        """Indica se o texto já contém o padrão de término depois do padrão inicial."""
+        starts_match = re.search(start, texto)
+        if not starts_match:
+            return False
+        ends_match = re.search(end, texto)
+        return bool(ends_match) and ends_match.group(0) in texto[starts_match.end():]
+
+    @staticmethod
+    def _extrair_trecho(file: Arquivo, start: str, end: str) -> str:
+        """
+        Retorna o trecho entre os padrões `start` e `end` nas 4 primeiras páginas, ou None.
+        As páginas são lidas uma a uma e a leitura para assim que o término aparece depois do início;
+        como a busca é feita no texto acumulado, padrões que atravessam a quebra de página também são
+        encontrados. O trecho é o mesmo que seria obtido das 4 páginas completas.
+        """
+        logger.debug("Extraindo texto do PDF")
+        for paginas in range(1, Contrato.PAGINAS_SECAO + 1):
+            texto = file.extract_text(paginas)
+            if Contrato._secao_completa(texto, start, end):
+                logger.debug(f"Seção completa na(s) {paginas} primeira(s) página(s)")
+                break
+
+        if not re.search(r'\w+', texto):
+            logger.debug(f"Arquivo sem texto legível")
+            return None
+
+        logger.debug(f"Buscando padrão '{start}'")
+        starts_match = re.search(start, texto)
+        if not starts_match:
+            logger.debug(f"Padrão não encontrado")
+            return None
+
+        starts_text = starts_match.group(0)
+        logger.debug(f"Padrão inicial: '{starts_text}'")
+
+        logger.debug(f"Buscando padrão de término '{end}'")
+        ends_match = re.search(end, texto)
+        if not ends_match:
+            logger.debug(f"Padrão de término não encontrado")
+            return None
+
+        ends_text = ends_match.group(0)
+        logger.debug(f"Padrão de término: '{ends_text}'")
+
+        trecho_contrato = texto.split(starts_text)[1].split(ends_text)[0]
+        trecho_contrato = Contrato._remover_cabecalhos(trecho_contrato, file.extract_pages(paginas))
+        logger.debug(f"Trecho extraído ({len(trecho_contrato)} caracteres)")
+        return trecho_contrato
+
     @staticmethod
-    def _extract_address_data(files: list[Arquivo]) -> dict:
+    def _extract_address_data(files: list[Arquivo], ja_analisados: set[str] = None,
+                              progress_callback: Callable[[str, float, dict], None] = None) -> dict:
         logger.debug(f"Iniciando extração de {len(files)} arquivo(s)")
+        ja_analisados = ja_analisados or set()
 
-        starts = [r'CONTRATANTE', r'CONTRATANTE|inventariante|OUTORGANTES']
-        ends = [r'\nCLÁUSULA', r'\nCLÁUSULA|nomeia|OUTORGADOS']
+        # Apenas a primeira página: as seguintes só são lidas se a seção ainda não tiver terminado
+        Arquivo.preload_texts([f for f in files if not re.search(r'físico', f.file_name.lower())], 1)
 
         # Primeira tentativa: arquivos não físicos/assinados
         logger.debug("Primeira tentativa: arquivos não físicos/assinados")
-        for start, end in zip(starts, ends):
+        for idx, (start, end) in enumerate(zip(Contrato.STARTS, Contrato.ENDS)):
             for file in files:
+                if idx == 0 and file.file_id in ja_analisados:
+                    continue
                 if not re.search(r'físico|assinado', file.file_name.lower()):
                     try:
                         logger.info(f"Analisando arquivo: {file.file_name}")
-                        logger.debug("Extraindo texto do PDF")
-                        texto = utils.extract_text_from_pdf(file.content, 4)
-
-                        if not re.search(r'\w+', texto):
-                            logger.debug(f"Arquivo sem texto legível")
-                            continue
-
-                        logger.debug(f"Buscando padrão '{start}'")
-                        starts_match = re.search(start, texto)
-                        if not starts_match:
-                            logger.debug(f"Padrão não encontrado")
-                            continue
-
-                        starts_text = starts_match.group(0)
-                        logger.debug(f"Padrão inicial: '{starts_text}'")
-
-                        logger.debug(f"Buscando padrão de término '{end}'")
-                        ends_match = re.search(end, texto)
-                        if not ends_match:
-                            logger.debug(f"Padrão de término não encontrado")
+                        trecho_contrato = Contrato._extrair_trecho(file, start, end)
+                        if trecho_contrato is None:
                             continue
 
-                        ends_text = ends_match.group(0)
-                        logger.debug(f"Padrão de término: '{ends_text}'")
-
-                        trecho_contrato = texto.split(starts_text)[1].split(ends_text)[0]
-                        logger.debug(f"Trecho extraído ({len(trecho_contrato)} caracteres)")
-
-                        return Contrato._fetch(trecho_contrato)
+                        return Contrato._fetch(trecho_contrato, progress_callback)
 
                     except Exception as e:
                         logger.debug(f"Erro: {type(e).__name__} - {e}")
 
         # Segunda tentativa: todos os arquivos exceto físicos
         logger.debug("Segunda tentativa: todos arquivos (exceto físicos)")
-        for start, end in zip(starts, ends):
+        for start, end in zip(Contrato.STARTS, Contrato.ENDS):
             for file in files:
                 if not re.search(r'físico', file.file_name.lower()):
                     try:
                         logger.debug(f"Tentando: {file.file_name}")
-                        texto = utils.extract_text_from_pdf(file.content, 4)
-
-                        if not re.search(r'\w+', texto):
-                            logger.debug(f"Sem texto legível")
-                            continue
-
-                        starts_match = re.search(start, texto)
-                        ends_match = re.search(end, texto)
-
-                        if not starts_match or not ends_match:
-                            logger.debug(f"Padrões não encontrados")
+                        trecho_contrato = Contrato._extrair_trecho(file, start, end)
+                        if trecho_contrato is None:
                             continue
 
-                        trecho_contrato = texto.split(starts_match.group(0))[1].split(ends_match.group(0))[0]
                         logger.debug(f"Trecho encontrado em '{file.file_name}'")
-
-                        return Contrato._fetch(trecho_contrato)
+                        return Contrato._fetch(trecho_contrato, progress_callback)
 
                     except Exception as e:
                         logger.debug(f"Erro: {type(e).__name__} - {e}")
@@ -214,8 +374,44 @@ class Contrato:
         raise ContratoNaoEncontradoError('Nenhum contrato legível foi encontrado. Verifique se os arquivos contêm as seções CONTRATANTE e CLÁUSULA.')
 
     @classmethod
-    def from_files(cls, files: list[Arquivo]):
-        dados_extraidos = Contrato._extract_address_data(files)
+    def from_files(cls, files: list[Arquivo], progress_callback: Callable[[str, float, dict], None] = None):
+        dados_extraidos = Contrato._extract_address_data(files, progress_callback=progress_callback)
+        return cls(dados_extraidos.get('nome_completo', ''), dados_extraidos.get('qualificacao', ''))
+
+    @classmethod
+    def from_stream(cls, files: Iterable[Arquivo], progress_callback: Callable[[str, float, dict], None] = None):
+        """
+        Como `from_files`, mas analisa cada arquivo assim que ele chega. Ao encontrar a seção
+        CONTRATANTE…CLÁUSULA num arquivo não físico/assinado, encerra o fluxo (cancelando os downloads
+        pendentes). Caso contrário, aplica as demais tentativas de `from_files` aos arquivos recebidos.
+        `progress_callback(etapa, progresso, dados)` recebe o andamento da extração via IA.
+        """
+        recebidos = []
+        ja_analisados = set()
+        files = iter(files)
+        try:
+            for file in files:
+                recebidos.append(file)
+                if re.search(r'físico|assinado', file.file_name.lower()):
+                    continue
+
+                ja_analisados.add(file.file_id)
+                try:
+                    logger.info(f"Analisando arquivo: {file.file_name}")
+                    trecho_contrato = Contrato._extrair_trecho(file, Contrato.STARTS[0], Contrato.ENDS[0])
+                    if trecho_contrato is None:
+                        continue
+
+                    dados_extraidos = Contrato._fetch(trecho_contrato, progress_callback)
+                    return cls(dados_extraidos.get('nome_completo', ''), dados_extraidos.get('qualificacao', ''))
+
+                except Exception as e:
+                    logger.debug(f"Erro: {type(e).__name__} - {e}")
+        finally:
+            if hasattr(files, 'close'):
+                files.close()
+
+        dados_extraidos = Contrato._extract_address_data(recebidos, ja_analisados, progress_callback)
         return cls(dados_extraidos.get('nome_completo', ''), dados_extraidos.get('qualificacao', ''))
 
     @property
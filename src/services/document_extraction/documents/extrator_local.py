@@ -0,0 +1,134 @@
+import re
+from src.infrastructure.utils.string_manipulation import StringManipulation
+from src.utils.logger import setup_logger
+
+utils = StringManipulation()
+logger = setup_logger(__name__)
+
+class ExtratorQualificacao:
+    """
+    Extrai nome e qualificação do trecho CONTRATANTE…CLÁUSULA sem chamar a IA, com padrões compilados
+    e validação (dígitos verificadores do CPF, formato do CEP e do telefone). A qualificação é montada
+    na mesma ordem e formato pedidos no prompt. Quando algum dado essencial (nome, CPF, endereço, CEP)
+    falta, é inválido ou ambíguo, `extrair` retorna None e a extração segue para a IA.
+
+    Só o bloco do contratante é analisado: o texto é cortado no início do bloco do contratado/outorgado,
+    para que telefone, endereço ou CEP do advogado nunca sejam atribuídos ao cliente.
+    """
+
+    PALAVRA_NOME = r"[A-ZÀ-ÖØ-Ý][A-ZÀ-ÖØ-Ý'`]*\.?"
+    NOME = re.compile(rf"^[\s:,.\-–]*((?:{PALAVRA_NOME})(?: (?:{PALAVRA_NOME}))+)\s*[,;]")
+    NACIONALIDADE = re.compile(r'\b(brasileir[oa]s?(?:\s*\(a\))?|estrangeir[oa](?:\s*\(a\))?)', re.IGNORECASE)
+    ESTADO_CIVIL = re.compile(
+        r'\b(solteir[oa](?:\s*\(a\))?|casad[oa](?:\s*\(a\))?|divorciad[oa](?:\s*\(a\))?|viúv[oa](?:\s*\(a\))?|'
+        r'separad[oa](?:\s*\(a\))?(?: judicialmente)?|em união estável|convivente)', re.IGNORECASE)
+    PROFISSAO = re.compile(r'^\s*,\s*([^,\d]{3,60}?)\s*,')
+    NAO_PROFISSAO = re.compile(r'portador|inscrit|\bRG\b|CPF|resident|domiciliad|nascid|filh[oa]', re.IGNORECASE)
+    RG = re.compile(r'\bR\.?G\.?\b(?:\s*n[º°o.]*)?[\s:.]*(\d[\d.\-]{3,13}[\dxX])(?:\s*[-–]?\s*([A-Z]{2,6})\s*[/-]\s*([A-Z]{2})\b)?')
+    CPF = re.compile(r'\bCPF(?:/MF)?\b[^\d]{0,25}(\d{3}\.?\d{3}\.?\d{3}[-.]?\d{2})\b')
+    CPF_QUALQUER = re.compile(r'\bCPF\b', re.IGNORECASE)
+    CEP = re.compile(r'\bCEP\b[\s:.nº°]*(\d{2})\.?(\d{3})-?(\d{3})\b', re.IGNORECASE)
+    TELEFONE = re.compile(r'(?:telefone|celular|tel\.?|fone|whats\s*app)[^\d(+]{0,20}(?:\+?\s*55\s*)?\(?(\d{2})\)?\s*(9?\d{4})[\s.\-]?(\d{4})\b', re.IGNORECASE)
+    # Início do bloco do contratado/outorgado (advogado), que costuma vir logo após o do cliente
+    OUTRA_PARTE = re.compile(r'CONTRATAD|OUTORGAD', re.IGNORECASE)
+    ENDERECO = re.compile(r'residente\s+e\s+domiciliad[oa](?:\s*\(a\))?\s+(n[ao]|à|em)\s+(.+?)\s*[,\-–]?\s*\bCEP\b', re.IGNORECASE)
+
+    # Abreviações de logradouro, sempre com espaço após o ponto
+    ABREVIACOES = re.compile(r'\b(R|Av|Tv|Al|Rod|Est|Pç|Pc)\.\s*', re.IGNORECASE)
+    MINUSCULAS = {'de', 'da', 'do', 'das', 'dos', 'e'}
+    UF = re.compile(r'\s*(-|/)\s*([A-Za-z]{2})\s*$')
+
+    @staticmethod
+    def cpf_valido(cpf: str) -> bool:
+        digitos = [int(d) for d in re.sub(r'\D', '', cpf)]
+        if len(digitos) != 11 or len(set(digitos)) == 1:
+            return False
+        for tamanho in (9, 10):
+            soma = sum(d * peso for d, peso in zip(digitos[:tamanho], range(tamanho + 1, 1, -1)))
+            if (soma * 10 % 11) % 10 != digitos[tamanho]:
+                return False
+        return True
+
+    @classmethod
+    def _formatar_endereco(cls, endereco: str) -> str:
+        endereco = cls.ABREVIACOES.sub(lambda m: f"{m.group(1)}. ", endereco)
+        palavras = []
+        for idx, palavra in enumerate(endereco.split(' ')):
+            if idx > 0 and palavra.lower() in cls.MINUSCULAS:
+                palavras.append(palavra.lower())
+            else:
+                palavras.append(palavra[:1].upper() + palavra[1:].lower())
+        endereco = ' '.join(palavras)
+        # Cidade e UF no formato "São Paulo - SP"
+        endereco = cls.UF.sub(lambda m: f" - {m.group(2).upper()}", endereco)
+        return re.sub(r'\s+,', ',', endereco).strip(' ,-–')
+
+    @classmethod
+    def extrair(cls, trecho: str) -> dict:
+        # Hifenização de fim de linha: entre letras, a palavra é unida; entre dígitos (CPF, CEP, RG,
+        # telefone), o hífen faz parte do número e só a quebra de linha é removida
+        texto = re.sub(r'(?<=[^\W\d_])-\n(?=[^\W\d_])', '', trecho)
+        texto = re.sub(r'(?<=\d)-\s*\n\s*(?=\d)', '-', texto)
+        texto = re.sub(r'\s+', ' ', texto).strip()
+
+        # Todos os campos precisam estar no bloco do contratante
+        outra_parte = cls.OUTRA_PARTE.search(texto)
+        if outra_parte:
+            endereco_completo = cls.ENDERECO.search(texto)
+            if endereco_completo and endereco_completo.start() < outra_parte.start() < endereco_completo.end():
+                logger.debug("Extração local: endereço do contratante sem CEP antes do bloco do contratado")
+                return None
+            texto = texto[:outra_parte.start()]
+
+        nome = cls.NOME.search(texto)
+        if not nome:
+            logger.debug("Extração local: nome não encontrado")
+            return None
+
+        cpfs = {re.sub(r'\D', '', m.group(1)) for m in cls.CPF.finditer(texto)}
+        if len(cpfs) != 1 or len(cls.CPF_QUALQUER.findall(texto)) != len(cls.CPF.findall(texto)):
+            logger.debug("Extração local: CPF ausente, ilegível ou mais de um contratante")
+            return None
+        cpf = cpfs.pop()
+        if not cls.cpf_valido(cpf):
+            logger.debug("Extração local: CPF com dígitos verificadores inválidos")
+            return None
+
+        endereco = cls.ENDERECO.search(texto)
+        cep = cls.CEP.search(texto)
+        if not endereco or not cep:
+            logger.debug("Extração local: endereço ou CEP não encontrado")
+            return None
+
+        nacionalidade = cls.NACIONALIDADE.search(texto)
+        estado_civil = cls.ESTADO_CIVIL.search(texto)
+        rg = cls.RG.search(texto)
+        telefone = cls.TELEFONE.search(texto)
+
+        profissao = None
+        if estado_civil:
+            candidata = cls.PROFISSAO.match(texto[estado_civil.end():])
+            if candidata and not cls.NAO_PROFISSAO.search(candidata.group(1)):
+                profissao = candidata.group(1).strip()
+
+        # Concordância pelo gênero indicado na nacionalidade ou no estado civil
+        marcadores = [m.group(1) for m in (nacionalidade, estado_civil) if m]
+        feminino = bool(marcadores) and marcadores[0].split(' ')[0].lower().endswith('a') and '(a)' not in marcadores[0]
+
+        partes = [m.group(1).lower() for m in (nacionalidade, estado_civil) if m]
+        if profissao:
+            partes.append(profissao.lower())
+        if rg:
+            orgao = f" {rg.group(2)}/{rg.group(3)}" if rg.group(2) else ''
+            partes.append(f"portador{'a' if feminino else ''} do RG n. {rg.group(1)}{orgao}")
+        partes.append(f"inscrit{'a' if feminino else 'o'} no CPF sob o n. {utils.cpf_formatado(cpf)}")
+        partes.append(f"residente e domiciliad{'a' if feminino else 'o'} {endereco.group(1).lower()} "
+                      f"{cls._formatar_endereco(endereco.group(2))}")
+        partes.append(f"CEP {cep.group(1)}{cep.group(2)}-{cep.group(3)}")
+        if telefone:
+            partes.append(f"Telefone: ({telefone.group(1)}) {telefone.group(2)}-{telefone.group(3)}")
+
+        return {
+            'nome_completo': nome.group(1).strip(),
+            'qualificacao': ', '.join(partes),
+        }
@@ -1,19 +1,170 @@
+import threading
+from concurrent.futures import Future
 from io import BytesIO
+from typing import Callable
+from src.infrastructure.utils.pdf_backends import get_backend
+from src.infrastructure.utils.pdf_extraction import ExtratorPdf
+from src.infrastructure.utils.string_manipulation import StringManipulation
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+utils = StringManipulation()
 
 class Arquivo:
-    
+
     def __init__(self,
                  file_id: str,
                  file_name: str,
                  parents: list[str],
                  mime_type: str,
                  content: BytesIO = None,
+                 file_size: int = None,
+                 md5_checksum: str = None,
+                 modified_time: str = None,
+                 loader: Callable[[], bytes] = None,
                  ):
-        
+
         self.file_id = file_id
         self.file_name = file_name
         self.parents = parents
         self.mime_type = mime_type
-        self.content = content
-        self.file_size = None
-    
\ No newline at end of file
+        self.file_size = file_size
+        self.md5_checksum = md5_checksum
+        self.modified_time = modified_time
+        self.download_error = None
+        self.regra_captura = None
+        self._normalized_name = None
+        self._content = content
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._lock_texto = threading.Lock()
+        self._backend = None
+        self._documento = None
+        self._num_pages = None
+        self._page_texts = []
+        self._text_error = False
+
+    @property
+    def content(self) -> BytesIO:
+        """Conteúdo do arquivo. Quando há um loader, é baixado no primeiro acesso e memorizado."""
+        if self._content is None and self._loader is not None:
+            with self._lock:
+                if self._content is None:
+                    self._content = BytesIO(self._loader())
+        return self._content
+
+    @content.setter
+    def content(self, content: BytesIO):
+        self._content = content
+
+    @property
+    def version(self) -> str:
+        """Identifica a versão do conteúdo no Drive (md5Checksum ou, para arquivos nativos, modifiedTime)."""
+        return self.md5_checksum or self.modified_time
+
+    @property
+    def normalized_name(self) -> str:
+        """Nome normalizado (sem acentos, em minúsculas), calculado uma única vez."""
+        if self._normalized_name is None:
+            self._normalized_name = utils.normalize(self.file_name)
+        return self._normalized_name
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._content is not None
+
+    def extract_text(self, pages: int = None) -> str:
+        """
+        Texto das `pages` primeiras páginas (todas, se não informado), extraído pelo motor configurado
+        em PDF_BACKEND. Cada página é extraída uma única vez e memorizada: pedir as páginas 1..4 depois
+        da página 1 extrai apenas as páginas 2 a 4.
+        """
+        return ''.join(self.extract_pages(pages))
+
+    def extract_pages(self, pages: int = None) -> list[str]:
+        """Como `extract_text`, mas retorna o texto de cada página separadamente."""
+        with self._lock_texto:
+            if self._text_error:
+                return []
+            try:
+                # Páginas já extraídas (inclusive pelo ExtratorPdf) não exigem abrir o PDF
+                if self._num_pages is not None and len(self._page_texts) >= min(pages or self._num_pages, self._num_pages):
+                    return self._page_texts[:min(pages or self._num_pages, self._num_pages)]
+
+                if self._documento is None:
+                    self._backend = get_backend()
+                    self._documento = self._backend.open(self.content.getvalue())
+                    self._num_pages = self._backend.page_count(self._documento)
+
+                limite = min(pages or self._num_pages, self._num_pages)
+                for page in range(len(self._page_texts), limite):
+                    self._page_texts.append(self._backend.extract_page(self._documento, page))
+
+                return self._page_texts[:limite]
+            except Exception as e:
+                logger.debug(f"Erro ao extrair texto do arquivo '{self.file_name}': {e}")
+                self._text_error = True
+                return []
+
+    def _pages_pending(self, pages: int = None) -> bool:
+        if self._text_error or not self.is_loaded:
+            return False
+        if self._num_pages is None:
+            return True
+        return len(self._page_texts) < min(pages or self._num_pages, self._num_pages)
+
+    def _preload_text(self, resultado: tuple[int, list[str]]):
+        with self._lock_texto:
+            if resultado is None:
+                self._text_error = True
+                return
+            num_pages, textos = resultado
+            self._num_pages = num_pages
+            if len(textos) > len(self._page_texts):
+                self._page_texts = list(textos)
+
+    def preload_text_async(self, pages: int = None) -> Future:
+        """
+        Agenda no ExtratorPdf a extração das páginas que faltam no cache. O Future retornado é resolvido
+        com o próprio Arquivo depois que o texto é guardado no cache.
+        """
+        concluido = Future()
+        if not self._pages_pending(pages):
+            concluido.set_result(self)
+            return concluido
+
+        def guardar(futuro: Future):
+            try:
+                self._preload_text(futuro.result())
+            except Exception as e:
+                logger.debug(f"Erro ao extrair texto do arquivo '{self.file_name}': {e}")
+                self._preload_text(None)
+            concluido.set_result(self)
+
+        ExtratorPdf.submeter(self.content.getvalue(), pages).add_done_callback(guardar)
+        return concluido
+
+    @staticmethod
+    def preload_texts(files: list['Arquivo'], pages: int = None):
+        """Extrai em paralelo, com o ExtratorPdf, as páginas que ainda faltam no cache de vários arquivos."""
+        pendentes = [f for f in files if f._pages_pending(pages)]
+        if not pendentes:
+            return
+
+        resultados = ExtratorPdf.extrair([f.content.getvalue() for f in pendentes], pages)
+        for file, resultado in zip(pendentes, resultados):
+            file._preload_text(resultado)
+
+    @classmethod
+    def from_drive(cls, file: dict, parent_id: str = None, content: BytesIO = None, loader: Callable[[], bytes] = None):
+        """Cria o Arquivo a partir de um item retornado pela busca do Drive."""
+        return cls(file['id'],
+                   file['name'],
+                   file.get('parents') or ([parent_id] if parent_id else []),
+                   file.get('mimeType'),
+                   content,
+                   file_size=int(file['size']) if file.get('size') else None,
+                   md5_checksum=file.get('md5Checksum'),
+                   modified_time=file.get('modifiedTime'),
+                   loader=loader)
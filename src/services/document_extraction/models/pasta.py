@@ -1,10 +1,17 @@
+import os
 import re
+import hashlib
+from functools import partial
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from src.services.document_extraction.models.arquivo import Arquivo
-from src.infrastructure.utils.string_manipulation import StringManipulation
+from src.services.document_extraction.models.regras_captura import MotorRegras, RegraCaptura
 from src.infrastructure.google_api import GoogleApiService
+from dotenv import load_dotenv
 from src.utils.logger import setup_logger
-from src.utils.exceptions import ArquivoNaoEncontradoError, PastaNaoEncontradaError
+from src.utils.exceptions import ArquivoNaoEncontradoError, PastaNaoEncontradaError, GoogleApiConnectionError
+
+load_dotenv()
 
 logger = setup_logger(__name__)
 
@@ -27,50 +34,84 @@ class Pasta(FileNames):
         },
     }
 
+    # Compiladas uma única vez, na definição da classe
+    motor_regras = MotorRegras(arquivos)
+
+    PADROES_RELEVANTES = re.compile(r'entrevista|relatorio|relatoiro|relatorio( do)? (acidente|acidental)|resumo_dos_fatos-\d{8,10}\.pdf|questionario|contrato|contratos|kit|assinar|cliente|prestacao de servicos|ctps|carteira de trabalho|cnis|extrato')
+    MIME_IGNORADOS = re.compile(r'video|audio')
+    FILE_FIELDS = ('id', 'name', 'parents', 'mimeType', 'size', 'md5Checksum', 'modifiedTime')
+    FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+    # Limites da listagem recursiva
+    MAX_PROFUNDIDADE = 3
+    MAX_PASTAS = 200
+    PASTAS_POR_CONSULTA = 20
+    CONSULTAS_SIMULTANEAS = 4
+
+    # Envia os termos de nome das regras na própria consulta ao Drive (0 desativa)
+    FILTRO_NOME_NA_CONSULTA = bool(int(os.getenv('DRIVE_FILTRO_NOME_NA_CONSULTA', '1')))
+
     def __init__(self, folder_id: str, folder_name: str, documents: list[Arquivo] = None):
         self.folder_id = folder_id
         self.folder_name = folder_name
         self.documents = documents
+        # Tipo de arquivo cujos termos de nome filtraram a última listagem (None: listagem completa)
+        self.filtro_listagem = None
         self.drive_api = GoogleApiService()
-        self.utils = StringManipulation()
 
-    def list_files(self, recursive: bool = False, folder_id: str = None, with_content: bool = True) -> list[Arquivo]:
+    def list_files(self, recursive: bool = False, folder_id: str = None, with_content: bool = True,
+                   max_depth: int = None, max_folders: int = None, file_name: str = None) -> list[Arquivo]:
+        """
+        Lista os arquivos da pasta. Com `file_name`, os termos de nome das regras desse tipo são enviados
+        na consulta ao Drive, que devolve apenas os candidatos; as regras continuam sendo aplicadas depois.
+        Só há filtro quando todos os termos são literais (ver RegraCaptura.termos_nome).
+        """
         folder_id = self.folder_id if not folder_id else folder_id
 
         logger.debug(f"Listando arquivos da pasta (ID: {folder_id[:15]}...)")
 
+        filtro = None
+        if file_name and self.FILTRO_NOME_NA_CONSULTA:
+            filtro = self.motor_regras.consulta_nome(file_name)
+            if filtro:
+                logger.debug(f"Filtro de nome na consulta: {filtro}")
+
         try:
-            query = f"'{folder_id}' in parents and mimeType != 'application/vnd.google-apps.folder' and trashed = false"
-            result = self.drive_api.search(query)
-            files = result.get('files', [])
+            def relevante(file: Arquivo) -> bool:
+                return bool(
+                    self.PADROES_RELEVANTES.search(file.normalized_name) and
+                    not self.MIME_IGNORADOS.search(str(file.mime_type))
+                    )
+
+            origem = self._listar(folder_id, recursive, max_depth, max_folders, filtro)
 
-            if result.get('files') is None:
-                logger.error("Pasta não encontrada ou sem permissão de acesso")
-                raise PastaNaoEncontradaError("Pasta não encontrada. Verifique se o link está correto e se você tem permissão de acesso.")
+            # Os arquivos são filtrados à medida que as páginas da busca chegam. O conteúdo é baixado
+            # sob demanda, apenas para os arquivos que passam pelas regras de nome
+            files = []
+            total = 0
+            for file in origem:
+                total += 1
+                arquivo = Arquivo.from_drive(file, folder_id, loader=self._loader(file))
+                if not with_content or relevante(arquivo):
+                    files.append(arquivo)
 
-            logger.debug(f"Encontrados {len(files)} arquivo(s) na pasta")
+            if filtro and not files:
+                # Sem nenhum candidato (o termo pode estar no meio de uma palavra), a pasta é listada por completo
+                logger.debug("Nenhum arquivo com o filtro de nome, listando a pasta inteira")
+                return self.list_files(recursive, folder_id, with_content, max_depth, max_folders)
 
-            if recursive:
-                for folder in self.drive_api.search(query.replace('!=','=')).get('files', []):
-                    files.extend({"id":f.file_id, "name":f.file_name, "mimeType":f.mime_type} for f in self.list_files(recursive=True, folder_id=folder['id']))
+            logger.debug(f"Encontrados {total} arquivo(s) na pasta")
 
             if with_content:
-                patterns = r'entrevista|relatorio|relatoiro|relatorio( do)? (acidente|acidental)|resumo_dos_fatos-\d{8,10}\.pdf|questionario|contrato|contratos|kit|assinar|cliente|prestacao de servicos|ctps|carteira de trabalho|cnis|extrato'
-                logger.debug("Filtrando arquivos por padrões de nome")
-                files_before = len(files)
-                files = [f for f in files if re.search(patterns, self.utils.normalize(f['name']))]
-                files = [f for f in files if not re.search(r'video|audio', str(f['mimeType']))]
                 logger.info(f"{len(files)} arquivo(s) encontrado(s)")
 
                 if files:
-                    logger.debug(f"Arquivos: {', '.join([f['name'] for f in files])}")
-                    contents = self.drive_api.batch_download_file([f['id'] for f in files])
-                    self.documents = [Arquivo(file['id'], file['name'], folder_id, file['mimeType'], BytesIO(content)) for file, content in zip(files, contents)]
+                    logger.debug(f"Arquivos: {', '.join([f.file_name for f in files])}")
                 else:
                     logger.warning("Nenhum arquivo relevante encontrado")
-                    self.documents = []
-            else:
-                self.documents = [Arquivo(file['id'], file['name'], self.folder_id, file['mimeType'], None) for file in files]
+
+            self.documents = files
+            self.filtro_listagem = file_name if filtro else None
 
             return self.documents
 
@@ -80,44 +121,147 @@ class Pasta(FileNames):
             logger.debug(f"Erro ao listar arquivos: {type(e).__name__} - {e}")
             raise
 
-    def get_file(self, file_name: str) -> list[Arquivo]:
+    def _listar(self, folder_id: str, recursive: bool, max_depth: int = None, max_folders: int = None, filtro: str = None):
+        if recursive:
+            return self._listar_arvore(folder_id, max_depth, max_folders, filtro)
+
+        query = f"'{folder_id}' in parents and mimeType != '{self.FOLDER_MIME_TYPE}' and trashed = false"
+        if filtro:
+            query += f" and ({filtro})"
+        return self.drive_api.iter_search(query, self.FILE_FIELDS)
+
+    def _listar_filhos(self, parent_ids: list[str], filtro: str = None) -> list[dict]:
+        pais = ' or '.join(f"'{parent_id}' in parents" for parent_id in parent_ids)
+        query = f"({pais}) and trashed = false"
+        if filtro:
+            # As subpastas continuam sendo retornadas para que a árvore possa ser percorrida
+            query += f" and (mimeType = '{self.FOLDER_MIME_TYPE}' or {filtro})"
+        return list(self.drive_api.iter_search(query, self.FILE_FIELDS))
+
+    def _listar_arvore(self, folder_id: str, max_depth: int = None, max_folders: int = None, filtro: str = None) -> list[dict]:
+        """
+        Lista os arquivos da pasta e de suas subpastas em largura. As pastas de cada nível são
+        agrupadas em consultas `'a' in parents or 'b' in parents`, executadas em paralelo, de modo
+        que o número de rodadas cresce com a profundidade da árvore e não com o total de pastas.
+        """
+        max_depth = self.MAX_PROFUNDIDADE if max_depth is None else max_depth
+        max_folders = max_folders or self.MAX_PASTAS
+
+        files = []
+        visitadas = {folder_id}
+        nivel = [folder_id]
+        profundidade = 0
+
+        with ThreadPoolExecutor(max_workers=self.CONSULTAS_SIMULTANEAS, thread_name_prefix='drive-listagem') as executor:
+            while nivel:
+                grupos = [nivel[i:i + self.PASTAS_POR_CONSULTA] for i in range(0, len(nivel), self.PASTAS_POR_CONSULTA)]
+                logger.debug(f"Nível {profundidade}: {len(nivel)} pasta(s) em {len(grupos)} consulta(s)")
+
+                proximo_nivel = []
+                for itens in executor.map(partial(self._listar_filhos, filtro=filtro), grupos):
+                    for item in itens:
+                        if item.get('mimeType') != self.FOLDER_MIME_TYPE:
+                            files.append(item)
+                        elif item['id'] in visitadas or profundidade >= max_depth:
+                            continue
+                        elif len(visitadas) >= max_folders:
+                            logger.warning(f"Limite de {max_folders} pasta(s) atingido, subpasta '{item['name']}' ignorada")
+                        else:
+                            visitadas.add(item['id'])
+                            proximo_nivel.append(item['id'])
+
+                nivel = proximo_nivel
+                profundidade += 1
+
+        logger.debug(f"{len(visitadas)} pasta(s) percorrida(s) em {profundidade} nível(is)")
+        return files
+
+    def _loader(self, file: dict):
+        version = file.get('md5Checksum') or file.get('modifiedTime')
+        return lambda: self.drive_api.download_file(file['id'], version)
+
+    def _carregar_conteudos(self, files: list[Arquivo]):
+        """Baixa em paralelo o conteúdo dos arquivos que ainda não foram carregados."""
+        pendentes = [f for f in files if not f.is_loaded and not f.download_error]
+        if not pendentes:
+            return
+
+        downloads = self.drive_api.batch_download_file([f.file_id for f in pendentes], versions={f.file_id: f.version for f in pendentes})
+        for file, download in zip(pendentes, downloads):
+            if download.success:
+                file.content = BytesIO(download.content)
+            else:
+                file.download_error = download.error
+                logger.warning(f"Não foi possível baixar '{file.file_name}': {download.error}")
+
+        if all(f.download_error for f in files):
+            raise GoogleApiConnectionError("Erro ao baixar arquivos do Drive: nenhum arquivo pôde ser baixado")
+
+    def _candidatos_por_nome(self, regra: RegraCaptura) -> list[Arquivo]:
+        return self.motor_regras.candidatos(regra, self.documents)
+
+    def _corresponde_texto(self, regra: RegraCaptura, file: Arquivo) -> bool:
+        logger.info(f"Analisando arquivo: {file.file_name}")
+        if regra.corresponde_texto(file.extract_text(1).lower()):
+            logger.debug(f"'{file.file_name}' corresponde às regras de conteúdo")
+            return True
+        return False
+
+    @staticmethod
+    def _capturado(regra: RegraCaptura, file: Arquivo) -> Arquivo:
+        file.regra_captura = str(regra)
+        logger.debug(f"'{file.file_name}' capturado pela regra {regra}")
+        return file
+
+    def _validar_tipo(self, file_name: str):
         logger.debug(f"Buscando arquivo(s) do tipo: {file_name}")
 
-        if file_name not in self.arquivos:
+        if file_name not in self.motor_regras:
             logger.error(f"Tipo de arquivo inválido: {file_name}")
             raise ArquivoNaoEncontradoError(f'Nome de arquivo "{file_name}" é inválido')
 
-        if not self.documents:
+        if not self.documents or self.filtro_listagem not in (None, file_name):
             logger.debug("Listando arquivos da pasta")
-            self.list_files()
+            self.list_files(file_name=file_name)
 
         logger.debug(f"Aplicando regras em {len(self.documents)} documento(s)")
 
+    def impressao_digital(self, file_name: str) -> str:
+        """
+        Hash dos IDs e versões dos arquivos que passam pelas regras de nome do tipo. Muda sempre que um
+        candidato é adicionado, removido ou alterado no Drive, sem que nenhum conteúdo seja baixado.
+        """
+        self._validar_tipo(file_name)
+
+        candidatos = {}
+        for regra in self.motor_regras.regras(file_name):
+            for file in self._candidatos_por_nome(regra):
+                candidatos[file.file_id] = file.version
+        return hashlib.sha256('\n'.join(f'{file_id}:{versao}' for file_id, versao in sorted(candidatos.items())).encode()).hexdigest()
+
+    def get_file(self, file_name: str) -> list[Arquivo]:
+        self._validar_tipo(file_name)
+
+        regras = self.motor_regras.regras(file_name)
         filtered_files = []
-        for regra_idx, regra in enumerate(self.arquivos[file_name]['regras_captura']):
-            logger.debug(f"Aplicando regra {regra_idx + 1}/{len(self.arquivos[file_name]['regras_captura'])}")
-
-            for file in self.documents:
-                normalized_name = self.utils.normalize(file.file_name)
-                if (
-                    all(re.search(term, normalized_name) for term in regra['name_contains']) and
-                    all(not re.search(term, normalized_name) for term in regra['not_name_contains'])
-                    ):
-                    if not regra['text_contains'] and not regra['not_text_contains']:
-                        logger.debug(f"'{file.file_name}' corresponde às regras")
-                        filtered_files.append(file)
-                    else:
-                        logger.info(f"Analisando arquivo: {file.file_name}")
-                        text = self.utils.extract_text_from_pdf(file.content, 1).lower()
-                        if (
-                            all(re.search(term, text) for term in regra['text_contains']) and
-                            all(not re.search(term, text) for term in regra['not_text_contains'])
-                            ):
-                            logger.debug(f"'{file.file_name}' corresponde às regras de conteúdo")
-                            filtered_files.append(file)
+        for regra in regras:
+            logger.debug(f"Aplicando regra {regra.indice + 1}/{len(regras)}")
+
+            # Predicados de nome primeiro: o conteúdo só é baixado para os arquivos que passarem neles
+            candidatos = self._candidatos_por_nome(regra)
+
+            if candidatos and regra.usa_texto:
+                self._carregar_conteudos(candidatos)
+                Arquivo.preload_texts(candidatos, 1)
+
+            for file in candidatos:
+                if not regra.usa_texto:
+                    filtered_files.append(self._capturado(regra, file))
+                elif not file.download_error and self._corresponde_texto(regra, file):
+                    filtered_files.append(self._capturado(regra, file))
 
             if filtered_files:
-                logger.debug(f"Regra {regra_idx + 1} retornou {len(filtered_files)} arquivo(s)")
+                logger.debug(f"Regra {regra.indice + 1} retornou {len(filtered_files)} arquivo(s)")
                 break
 
         filtrados_unicos = []
@@ -135,3 +279,79 @@ class Pasta(FileNames):
             logger.debug(f"{len(filtrados_unicos)} arquivo(s) '{file_name}': {', '.join([f.file_name for f in filtrados_unicos])}")
 
         return filtrados_unicos
+
+    def iter_file(self, file_name: str):
+        """
+        Versão em fluxo de `get_file`: produz cada arquivo assim que seu download termina e ele passa
+        pelas regras, sem esperar os demais. Encerrar o gerador cancela os downloads pendentes.
+        """
+        self._validar_tipo(file_name)
+
+        nomes_vistos = set()
+        encontrados = 0
+
+        def unico(file: Arquivo) -> bool:
+            nome = file.file_name.replace('Cópia de', '')
+            if nome in nomes_vistos:
+                logger.debug(f"'{file.file_name}' ignorado (duplicado)")
+                return False
+            nomes_vistos.add(nome)
+            return True
+
+        regras = self.motor_regras.regras(file_name)
+        for regra in regras:
+            logger.debug(f"Aplicando regra {regra.indice + 1}/{len(regras)}")
+
+            candidatos = self._candidatos_por_nome(regra)
+
+            if not regra.usa_texto:
+                for file in candidatos:
+                    if unico(file):
+                        encontrados += 1
+                        yield self._capturado(regra, file)
+            else:
+                # A primeira página de cada arquivo é extraída no ExtratorPdf assim que o download termina;
+                # os arquivos são analisados na ordem em que as extrações ficam prontas
+                extracoes = {}
+
+                def concluidos(todos: bool):
+                    futuros = as_completed(list(extracoes)) if todos else [f for f in list(extracoes) if f.done()]
+                    for futuro in futuros:
+                        yield extracoes.pop(futuro)
+
+                por_id = {f.file_id: f for f in candidatos if not f.is_loaded and not f.download_error}
+                for file in candidatos:
+                    if file.is_loaded:
+                        extracoes[file.preload_text_async(1)] = file
+
+                downloads = self.drive_api.iter_download_file(list(por_id), versions={f.file_id: f.version for f in por_id.values()})
+                try:
+                    for download in downloads:
+                        file = por_id[download.file_id]
+                        if not download.success:
+                            file.download_error = download.error
+                            logger.warning(f"Não foi possível baixar '{file.file_name}': {download.error}")
+                        else:
+                            file.content = BytesIO(download.content)
+                            extracoes[file.preload_text_async(1)] = file
+
+                        for pronto in concluidos(False):
+                            if self._corresponde_texto(regra, pronto) and unico(pronto):
+                                encontrados += 1
+                                yield self._capturado(regra, pronto)
+                finally:
+                    downloads.close()
+
+                for pronto in concluidos(True):
+                    if self._corresponde_texto(regra, pronto) and unico(pronto):
+                        encontrados += 1
+                        yield self._capturado(regra, pronto)
+
+                if candidatos and all(f.download_error for f in candidatos):
+                    raise GoogleApiConnectionError("Erro ao baixar arquivos do Drive: nenhum arquivo pôde ser baixado")
+
+            if encontrados:
+                logger.debug(f"Regra {regra.indice + 1} retornou {encontrados} arquivo(s)")
+                return
+
+        logger.warning(f"Nenhum arquivo '{file_name}' encontrado")
@@ -0,0 +1,128 @@
+import re
+import itertools
+from src.services.document_extraction.models.arquivo import Arquivo
+
+# Apenas termos literais (letras, dígitos e espaços) podem ser enviados ao Drive como `name contains`
+_TERMO_LITERAL = re.compile(r'^[a-z0-9 ]+$')
+
+# As regras casam o nome normalizado (sem acentos), mas o `contains` do Drive não ignora acentos. Cada termo
+# é enviado com as grafias acentuadas possíveis: 'ç' antes de a/o/u, 'ã'/'õ' antes de o/e (-ção, -ções,
+# -ães) e, no máximo, um acento tônico por palavra
+_CEDILHA_TIL = [(re.compile(r'(?<=\w)c(?=[aou])'), 'ç'), (re.compile(r'a(?=[oe])'), 'ã'), (re.compile(r'o(?=e)'), 'õ')]
+_ACENTOS_TONICOS = {'a': 'áâ', 'e': 'éê', 'i': 'í', 'o': 'óô', 'u': 'ú'}
+# O `contains` casa prefixos de palavras: o termo é cortado antes do primeiro ç/ã/õ possível se sobrarem
+# ao menos estes caracteres ('prestacao' -> 'presta'), o que reduz o número de grafias
+_PREFIXO_MINIMO = 4
+
+def _grafias(termo: str) -> list[str]:
+    """Prefixos, com e sem acentos, que o `name contains` do Drive precisa para cobrir o termo normalizado."""
+    posicoes = {m.start(): letra for padrao, letra in _CEDILHA_TIL for m in padrao.finditer(termo)}
+    if posicoes and min(posicoes) >= _PREFIXO_MINIMO:
+        termo, posicoes = termo[:min(posicoes)], {}
+
+    grafias = []
+    for escolha in itertools.product(*[(None, letra) for letra in posicoes.values()]):
+        letras = list(termo)
+        for posicao, letra in zip(posicoes, escolha):
+            if letra:
+                letras[posicao] = letra
+        base = ''.join(letras)
+        grafias.append(base)
+        grafias.extend(base[:k] + acento + base[k + 1:]
+                       for k, letra in enumerate(base) for acento in _ACENTOS_TONICOS.get(letra, ''))
+    return list(dict.fromkeys(grafias))
+
+class RegraCaptura:
+    """
+    Uma regra de `Pasta.arquivos` com os padrões já compilados. Os predicados de nome são avaliados
+    sobre o nome normalizado do Arquivo; os de texto, sobre o texto da primeira página em minúsculas.
+    """
+
+    def __init__(self, tipo: str, indice: int, regra: dict):
+        self.tipo = tipo
+        self.indice = indice
+        self.name_contains = [re.compile(term) for term in regra.get('name_contains', [])]
+        self.not_name_contains = [re.compile(term) for term in regra.get('not_name_contains', [])]
+        self.text_contains = [re.compile(term) for term in regra.get('text_contains', [])]
+        self.not_text_contains = [re.compile(term) for term in regra.get('not_text_contains', [])]
+
+    @property
+    def usa_texto(self) -> bool:
+        """Se a regra depende do conteúdo do arquivo (e, portanto, do download)."""
+        return bool(self.text_contains or self.not_text_contains)
+
+    def corresponde_nome(self, file: Arquivo) -> bool:
+        nome = file.normalized_name
+        return (
+            all(term.search(nome) for term in self.name_contains) and
+            not any(term.search(nome) for term in self.not_name_contains)
+            )
+
+    def corresponde_texto(self, texto: str) -> bool:
+        return (
+            all(term.search(texto) for term in self.text_contains) and
+            not any(term.search(texto) for term in self.not_text_contains)
+            )
+
+    def termos_nome(self) -> list[list[str]]:
+        """
+        Termos positivos de nome para o `name contains` do Drive: uma lista de alternativas (unidas por
+        `or`) para cada padrão de `name_contains` (unidos por `and`). As alternativas cobrem as grafias
+        acentuadas de cada termo (ver _grafias); de termos com várias palavras, basta a primeira. Retorna
+        None se algum padrão não for uma lista de literais, que o Drive não consegue expressar.
+
+        A consulta é um superconjunto das regras, exceto quando o termo aparece no meio de uma palavra
+        ('meucontrato'), já que o Drive casa apenas inícios de palavras.
+        """
+        if not self.name_contains:
+            return None
+
+        termos = []
+        for padrao in self.name_contains:
+            alternativas = []
+            for termo in padrao.pattern.split('|'):
+                if not _TERMO_LITERAL.match(termo) or not termo.strip():
+                    return None
+                alternativas.extend(_grafias(termo.split()[0]))
+            # Prefixos já cobrem os termos mais longos: 'contrato' também casa 'contratos'
+            termos.append([termo for termo in dict.fromkeys(alternativas)
+                           if not any(outro != termo and termo.startswith(outro) for outro in alternativas)])
+        return termos
+
+    def __str__(self):
+        return f"{self.tipo} #{self.indice + 1}"
+
+class MotorRegras:
+    """Compila uma única vez as regras de captura de cada tipo de arquivo de `Pasta.arquivos`."""
+
+    def __init__(self, arquivos: dict):
+        self._regras = {
+            tipo: [RegraCaptura(tipo, indice, regra) for indice, regra in enumerate(config['regras_captura'])]
+            for tipo, config in arquivos.items()
+        }
+
+    def __contains__(self, tipo: str) -> bool:
+        return tipo in self._regras
+
+    def regras(self, tipo: str) -> list[RegraCaptura]:
+        return self._regras[tipo]
+
+    def consulta_nome(self, tipo: str) -> str:
+        """
+        Cláusula `name contains` do Drive equivalente aos termos positivos de nome das regras do tipo,
+        ou None se alguma regra não puder ser traduzida. A cláusula é um pré-filtro: as regras
+        compiladas continuam sendo aplicadas aos arquivos retornados.
+        """
+        clausulas = []
+        for regra in self._regras[tipo]:
+            termos = regra.termos_nome()
+            if termos is None:
+                return None
+            clausulas.append(' and '.join(
+                '(' + ' or '.join(f"name contains '{termo}'" for termo in alternativas) + ')'
+                for alternativas in termos))
+        return ' or '.join(f'({clausula})' for clausula in clausulas) if clausulas else None
+
+    def candidatos(self, regra: RegraCaptura, files: list[Arquivo]) -> list[Arquivo]:
+        """Arquivos que passam pelos predicados de nome da regra, sem tocar no conteúdo."""
+        return [file for file in files if regra.corresponde_nome(file)]
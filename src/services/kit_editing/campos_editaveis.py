@@ -2,3 +2,10 @@ class CamposKitAcidentario:
 
     nome_completo = '[NOME COMPLETO]'
     qualificacao = '[QUALIFICAÇÃO]'
+    qualificacao_sem_telefone = '[QUALIFICAÇÃO SEM TELEFONE]'
+
+    @classmethod
+    def campos(cls) -> dict[str, str]:
+        """Placeholder de cada campo, pelo nome do atributo do Contrato de onde vem o valor."""
+        return {atributo: placeholder for atributo, placeholder in vars(cls).items()
+                if isinstance(placeholder, str) and placeholder.startswith('[')}
@@ -1,6 +1,11 @@
 import os
+import re
+import threading
 from dotenv import load_dotenv
 from src.infrastructure.google_api import GoogleApiService
+from src.infrastructure.google_batch import LoteRequisicoesGoogle
+from src.services.kit_editing.pool_modelos import PoolCopiasModelo
+from src.services.kit_editing.modelos import ModeloDocumento, RegistroModelos
 from src.utils.logger import setup_logger
 from src.utils.exceptions import TemplateNaoEncontradoError
 
@@ -10,14 +15,30 @@ logger = setup_logger(__name__)
 
 class EditorKitAcidentario:
 
-    def __init__(self, google_api_service: GoogleApiService):
+    # Placeholders encontrados em cada versão (modifiedTime) de cada modelo
+    _placeholders = {}
+    _lock_placeholders = threading.Lock()
+
+    def __init__(self, google_api_service: GoogleApiService, lote: LoteRequisicoesGoogle = None):
         self.google_api_service = google_api_service
+        # Na geração em lote, as chamadas de vários kits são agrupadas em requisições batch
+        self.lote = lote
         self.modelo_doc_id = os.getenv('TEMPLATE_ID', '1gxntpnK68RYiNQTXKDacyobYbBOhSlYj')
 
         if not self.modelo_doc_id or self.modelo_doc_id == 'your_google_drive_template_id_here':
             logger.warning("TEMPLATE_ID não configurado, usando valor padrão")
             self.modelo_doc_id = '1gxntpnK68RYiNQTXKDacyobYbBOhSlYj'
 
+        # Cópias do modelo preparadas em segundo plano (opcional, TEMPLATE_POOL_FOLDER_ID)
+        self.pool = PoolCopiasModelo.from_env(google_api_service, self.modelo_doc_id)
+        self.registro = RegistroModelos.from_env(self.modelo_doc_id)
+
+    def _executar(self, service, requisicao) -> dict:
+        if self.lote:
+            return self.lote.enviar(service, requisicao).result()
+        # Cada thread usa seu próprio cliente (GoogleApiService.service/docs_service)
+        return requisicao.execute()
+
     def _editar_kit(self, doc_id: str, substituicoes: dict):
         try:
             logger.debug(f"Editando kit com {len(substituicoes)} substituição(ões)")
@@ -35,10 +56,11 @@ class EditorKitAcidentario:
 
             if all_requests:
                 logger.debug(f"Enviando {len(all_requests)} substituição(ões)")
-                self.google_api_service.docs_service.documents().batchUpdate(
+                docs_service = self.google_api_service.docs_service
+                self._executar(docs_service, docs_service.documents().batchUpdate(
                     documentId=doc_id,
                     body={'requests': all_requests}
-                ).execute()
+                ))
                 logger.debug("Substituições aplicadas")
             else:
                 logger.warning("Nenhuma substituição para aplicar")
@@ -47,21 +69,69 @@ class EditorKitAcidentario:
             logger.error(f"Erro ao editar kit: {type(e).__name__} - {e}")
             raise TemplateNaoEncontradoError(f"Erro ao editar o kit: {str(e)}")
 
-    def _copiar_modelo_kit(self, pasta_destino_id: str) -> str:
+    NOME_KIT = 'Kit Acidentário - Automação'
+
+    @staticmethod
+    def _texto_documento(elementos: list) -> str:
+        partes = []
+        for elemento in elementos or []:
+            for trecho in (elemento.get('paragraph') or {}).get('elements', []):
+                partes.append((trecho.get('textRun') or {}).get('content', ''))
+            for linha in (elemento.get('table') or {}).get('tableRows', []):
+                for celula in linha.get('tableCells', []):
+                    partes.append(EditorKitAcidentario._texto_documento(celula.get('content')))
+            partes.append(EditorKitAcidentario._texto_documento((elemento.get('tableOfContents') or {}).get('content')))
+        return ''.join(partes)
+
+    def placeholders(self, template_id: str) -> set[str]:
+        """
+        Placeholders ([...]) presentes no modelo, em minúsculas, incluindo cabeçalhos e rodapés. O documento
+        só é lido de novo quando o modifiedTime do modelo muda, como no pool de cópias.
+        """
+        try:
+            service = self.google_api_service.service
+            versao = self._executar(service, service.files().get(fileId=template_id, fields='modifiedTime'))['modifiedTime']
+
+            placeholders = self._placeholders.get((template_id, versao))
+            if placeholders is None:
+                logger.debug(f"Lendo placeholders do modelo (ID: {template_id[:15]}...)")
+                docs_service = self.google_api_service.docs_service
+                documento = self._executar(docs_service, docs_service.documents().get(documentId=template_id))
+        except Exception as e:
+            logger.error(f"Erro ao ler modelo: {type(e).__name__} - {e}")
+            raise TemplateNaoEncontradoError(f"Erro ao ler o modelo do documento: {str(e)}")
+
+        if placeholders is None:
+            secoes = [documento.get('body', {}).get('content')]
+            for grupo in ('headers', 'footers', 'footnotes'):
+                secoes.extend(item.get('content') for item in (documento.get(grupo) or {}).values())
+            texto = ''.join(self._texto_documento(secao) for secao in secoes)
+            placeholders = {p.lower() for p in re.findall(r'\[[^\[\]]+\]', texto)}
+
+            with self._lock_placeholders:
+                # Versões anteriores do modelo não serão mais usadas
+                for chave in [chave for chave in self._placeholders if chave[0] == template_id]:
+                    del self._placeholders[chave]
+                self._placeholders[(template_id, versao)] = placeholders
+        return placeholders
+
+    def _copiar_modelo_kit(self, pasta_destino_id: str, template_id: str = None, nome: str = None) -> str:
+        template_id = template_id or self.modelo_doc_id
         try:
-            logger.debug(f"Copiando template (ID: {self.modelo_doc_id[:15]}...)")
+            logger.debug(f"Copiando template (ID: {template_id[:15]}...)")
 
             file_metadata = {
                 'parents': [pasta_destino_id],
-                'name': 'Kit Acidentário - Automação',
+                'name': nome or self.NOME_KIT,
                 'mimeType': 'application/vnd.google-apps.document'
             }
 
             logger.debug("Executando cópia via API")
-            novo_arquivo = self.google_api_service.service.files().copy(
-                fileId=self.modelo_doc_id,
+            service = self.google_api_service.service
+            novo_arquivo = self._executar(service, service.files().copy(
+                fileId=template_id,
                 body=file_metadata
-            ).execute()
+            ))
 
             novo_id = novo_arquivo.get('id')
             if not novo_id:
@@ -75,25 +145,35 @@ class EditorKitAcidentario:
             logger.error(f"Erro ao copiar template: {type(e).__name__} - {e}")
             raise TemplateNaoEncontradoError(f"Erro ao copiar template do kit: {str(e)}")
 
-    def gerar_kit(self, folder_link: str, substituicoes: dict) -> str:
+    def copiar_modelo(self, folder_link: str, modelo: ModeloDocumento = None) -> str:
+        """Primeira etapa da geração: copia o modelo para a pasta do cliente e retorna o ID da cópia."""
+        folder_id = folder_link.split('/')[-1]
+        logger.debug(f"Pasta destino: {folder_id[:15]}...")
+        template_id = modelo.template_id if modelo else self.modelo_doc_id
+        nome = modelo.nome_arquivo if modelo else self.NOME_KIT
+
+        doc_id = self.pool.reivindicar(folder_id, nome) if self.pool and template_id == self.modelo_doc_id else None
+        if not doc_id:
+            doc_id = self._copiar_modelo_kit(folder_id, template_id, nome)
+        if not doc_id:
+            logger.error("Template não foi copiado")
+            raise TemplateNaoEncontradoError("Erro ao gerar kit: template não foi copiado")
+        return doc_id
+
+    def preencher(self, doc_id: str, modelo: ModeloDocumento, contrato, placeholders: set[str]):
+        """
+        Preenche a cópia com os dados do Contrato, enviando apenas os `placeholders` existentes no modelo
+        (lidos antes, com `placeholders()`).
+        """
+        substituicoes = modelo.substituicoes(contrato, placeholders)
+        self._editar_kit(doc_id, substituicoes)
+        logger.info(f"Documento '{modelo.nome_arquivo}' gerado com sucesso")
+
+    def excluir_kit(self, doc_id: str):
+        """Remove uma cópia do modelo que não chegou a ser preenchida. Falhas são apenas registradas."""
         try:
-            logger.debug("Iniciando geração do kit")
-            folder_id = folder_link.split('/')[-1]
-            logger.debug(f"Pasta destino: {folder_id[:15]}...")
-
-            doc_id = self._copiar_modelo_kit(folder_id)
-
-            if doc_id:
-                self._editar_kit(doc_id, substituicoes)
-                logger.info("Kit gerado com sucesso")
-            else:
-                logger.error("Template não foi copiado")
-                raise TemplateNaoEncontradoError("Erro ao gerar kit: template não foi copiado")
-
-            return doc_id
-
-        except TemplateNaoEncontradoError:
-            raise
+            logger.debug(f"Removendo cópia não utilizada (ID: {doc_id[:15]}...)")
+            service = self.google_api_service.service
+            self._executar(service, service.files().delete(fileId=doc_id))
         except Exception as e:
-            logger.error(f"Erro ao gerar kit: {type(e).__name__} - {e}")
-            raise TemplateNaoEncontradoError(f"Erro ao gerar kit: {str(e)}")
\ No newline at end of file
+            logger.warning(f"Não foi possível remover a cópia não utilizada do kit: {type(e).__name__} - {e}")
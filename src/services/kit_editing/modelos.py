@@ -0,0 +1,75 @@
+import os
+import json
+from dotenv import load_dotenv
+from src.services.kit_editing.campos_editaveis import CamposKitAcidentario
+from src.utils.logger import setup_logger
+from src.utils.exceptions import TemplateNaoEncontradoError
+
+load_dotenv()
+
+logger = setup_logger(__name__)
+
+class ModeloDocumento:
+    """
+    Um modelo do Google Docs preenchido com os dados do Contrato. `campos` mapeia o atributo do
+    Contrato (inclusive propriedades derivadas, como `qualificacao_sem_telefone`) para o placeholder
+    no documento; por padrão, todos os campos de CamposKitAcidentario.
+    """
+
+    def __init__(self, nome: str, template_id: str, nome_arquivo: str, campos: dict[str, str] = None):
+        self.nome = nome
+        self.template_id = template_id
+        self.nome_arquivo = nome_arquivo
+        self.campos = campos or CamposKitAcidentario.campos()
+
+    def substituicoes(self, contrato, placeholders: set[str]) -> dict[str, str]:
+        """Substituições apenas dos placeholders presentes no modelo (`placeholders`, em minúsculas)."""
+        substituicoes = {}
+        for atributo, placeholder in self.campos.items():
+            valor = getattr(contrato, atributo, None)
+            if valor and placeholder.lower() in placeholders:
+                substituicoes[placeholder] = valor
+        return substituicoes
+
+    def __repr__(self):
+        return f'ModeloDocumento(nome={self.nome}, template_id={self.template_id})'
+
+class RegistroModelos:
+    """
+    Modelos disponíveis para geração. O kit acidentário (TEMPLATE_ID) está sempre registrado; outros
+    modelos (procurações, declarações etc.) vêm do JSON em TEMPLATES_CONFIG, uma lista de objetos com
+    "nome", "template_id", "nome_arquivo" e, opcionalmente, "campos" ({atributo: placeholder}).
+    """
+
+    KIT_ACIDENTARIO = 'kit_acidentario'
+
+    def __init__(self, modelos: list[ModeloDocumento]):
+        self.modelos = {modelo.nome: modelo for modelo in modelos}
+
+    @classmethod
+    def from_env(cls, template_id_kit: str):
+        modelos = [ModeloDocumento(cls.KIT_ACIDENTARIO, template_id_kit, 'Kit Acidentário - Automação')]
+
+        caminho = os.getenv('TEMPLATES_CONFIG')
+        if caminho:
+            try:
+                with open(caminho, encoding='utf-8') as arquivo:
+                    for item in json.load(arquivo):
+                        modelos.append(ModeloDocumento(item['nome'], item['template_id'], item['nome_arquivo'], item.get('campos')))
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Erro ao ler modelos de {caminho}: {type(e).__name__} - {e}")
+                raise TemplateNaoEncontradoError(f"Configuração de modelos inválida: {str(e)}")
+
+        return cls(modelos)
+
+    def selecionar(self, nomes: list[str] = None) -> list[ModeloDocumento]:
+        """Modelos pelos nomes (padrão: TEMPLATES_ATIVOS, ou apenas o kit acidentário)."""
+        if not nomes:
+            nomes = [nome.strip() for nome in os.getenv('TEMPLATES_ATIVOS', self.KIT_ACIDENTARIO).split(',') if nome.strip()]
+
+        desconhecidos = [nome for nome in nomes if nome not in self.modelos]
+        if desconhecidos:
+            logger.error(f"Modelo(s) não registrado(s): {', '.join(desconhecidos)}")
+            raise TemplateNaoEncontradoError(f"Modelo(s) não registrado(s): {', '.join(desconhecidos)}")
+
+        return [self.modelos[nome] for nome in nomes]
@@ -0,0 +1,162 @@
+import os
+import threading
+from collections import deque
+from dotenv import load_dotenv
+from src.infrastructure.google_api import GoogleApiService
+from src.utils.logger import setup_logger
+
+load_dotenv()
+
+logger = setup_logger(__name__)
+
+class PoolCopiasModelo:
+    """
+    Mantém `tamanho` cópias do modelo prontas numa pasta de preparo do Drive, para que a geração do
+    kit apenas mova uma delas para a pasta do cliente (files.update com addParents/removeParents),
+    em vez de esperar o files.copy. Uma thread em segundo plano repõe as cópias usadas.
+
+    Cada cópia guarda em appProperties o ID e o modifiedTime do modelo de origem. Ao reivindicar uma
+    cópia, o modifiedTime atual do modelo é conferido: se o modelo mudou, nenhuma cópia é entregue
+    (a geração faz a cópia direta) e o pool é descartado e refeito com a nova versão.
+    """
+
+    CHAVE_MODELO = 'kit_pool_modelo'
+    CHAVE_VERSAO = 'kit_pool_versao'
+
+    PASTA_ID = os.getenv('TEMPLATE_POOL_FOLDER_ID')
+    TAMANHO = int(os.getenv('TEMPLATE_POOL_SIZE', '3'))
+    # Intervalo máximo entre verificações do pool, em segundos
+    INTERVALO = float(os.getenv('TEMPLATE_POOL_INTERVALO', '300'))
+
+    _instancias = {}
+    _lock_instancias = threading.Lock()
+
+    def __init__(self, google_api_service: GoogleApiService, modelo_doc_id: str, pasta_id: str, tamanho: int):
+        self.google_api_service = google_api_service
+        self.modelo_doc_id = modelo_doc_id
+        self.pasta_id = pasta_id
+        self.tamanho = tamanho
+        self._lock = threading.Lock()
+        self._prontas = deque()
+        self._reivindicadas = set()
+        self._versao = None
+        self._acordar = threading.Event()
+        threading.Thread(target=self._executar, name='pool-modelo', daemon=True).start()
+
+    @classmethod
+    def from_env(cls, google_api_service: GoogleApiService, modelo_doc_id: str):
+        """Pool compartilhado do modelo, ou None se TEMPLATE_POOL_FOLDER_ID não estiver configurado."""
+        if not cls.PASTA_ID or cls.TAMANHO <= 0:
+            return None
+
+        with cls._lock_instancias:
+            if modelo_doc_id not in cls._instancias:
+                logger.debug(f"Iniciando pool de {cls.TAMANHO} cópia(s) do modelo")
+                cls._instancias[modelo_doc_id] = cls(google_api_service, modelo_doc_id, cls.PASTA_ID, cls.TAMANHO)
+            return cls._instancias[modelo_doc_id]
+
+    def _versao_modelo(self) -> str:
+        modelo = self.google_api_service.service.files().get(fileId=self.modelo_doc_id, fields='modifiedTime').execute()
+        return modelo['modifiedTime']
+
+    def _sincronizar(self, versao: str) -> tuple[list[str], list[str]]:
+        """Separa as cópias da pasta de preparo entre as da versão atual do modelo e as desatualizadas."""
+        query = f"'{self.pasta_id}' in parents and trashed = false"
+        prontas, antigas = [], []
+        for item in self.google_api_service.iter_search(query, ('id', 'appProperties')):
+            propriedades = item.get('appProperties') or {}
+            if propriedades.get(self.CHAVE_MODELO) != self.modelo_doc_id:
+                continue
+            (prontas if propriedades.get(self.CHAVE_VERSAO) == versao else antigas).append(item['id'])
+        return prontas, antigas
+
+    def _copiar(self, versao: str) -> str:
+        corpo = {
+            'parents': [self.pasta_id],
+            'name': 'Kit Acidentário - Pool',
+            'appProperties': {self.CHAVE_MODELO: self.modelo_doc_id, self.CHAVE_VERSAO: versao},
+        }
+        return self.google_api_service.service.files().copy(fileId=self.modelo_doc_id, body=corpo, fields='id').execute()['id']
+
+    def _excluir(self, doc_id: str):
+        try:
+            self.google_api_service.service.files().delete(fileId=doc_id).execute()
+        except Exception as e:
+            logger.debug(f"Erro ao remover cópia do pool: {type(e).__name__} - {e}")
+
+    def reabastecer(self):
+        versao = self._versao_modelo()
+
+        if versao != self._versao:
+            prontas, antigas = self._sincronizar(versao)
+            with self._lock:
+                if self._versao is not None:
+                    logger.info("Modelo do kit alterado, renovando cópias prontas")
+                self._versao = versao
+                self._prontas = deque(doc_id for doc_id in prontas if doc_id not in self._reivindicadas)
+                antigas = [doc_id for doc_id in antigas if doc_id not in self._reivindicadas]
+            for doc_id in antigas:
+                self._excluir(doc_id)
+            logger.debug(f"Pool do modelo: {len(prontas)} cópia(s) reaproveitada(s), {len(antigas)} descartada(s)")
+
+        while True:
+            with self._lock:
+                if self._versao != versao or len(self._prontas) >= self.tamanho:
+                    return
+            doc_id = self._copiar(versao)
+            with self._lock:
+                self._prontas.append(doc_id)
+            logger.debug(f"Pool do modelo: {len(self._prontas)}/{self.tamanho} cópia(s) pronta(s)")
+
+    def _executar(self):
+        while True:
+            try:
+                self.reabastecer()
+            except Exception as e:
+                logger.warning(f"Erro ao preparar cópias do modelo: {type(e).__name__} - {e}")
+            self._acordar.wait(self.INTERVALO)
+            self._acordar.clear()
+
+    def reivindicar(self, pasta_destino_id: str, nome: str) -> str:
+        """
+        Move uma cópia pronta para a pasta do cliente, já renomeada, e retorna seu ID. Retorna None se
+        não houver cópia pronta da versão atual do modelo; nesse caso, o modelo deve ser copiado diretamente.
+        """
+        try:
+            versao = self._versao_modelo()
+        except Exception as e:
+            logger.debug(f"Erro ao verificar versão do modelo: {type(e).__name__} - {e}")
+            return None
+
+        with self._lock:
+            doc_id = None
+            if versao == self._versao and self._prontas:
+                doc_id = self._prontas.popleft()
+                self._reivindicadas.add(doc_id)
+        self._acordar.set()
+
+        if not doc_id:
+            logger.debug("Nenhuma cópia pronta da versão atual do modelo")
+            return None
+
+        try:
+            corpo = {'name': nome, 'appProperties': {self.CHAVE_MODELO: None, self.CHAVE_VERSAO: None}}
+            self.google_api_service.service.files().update(
+                fileId=doc_id,
+                addParents=pasta_destino_id,
+                removeParents=self.pasta_id,
+                body=corpo,
+                fields='id'
+            ).execute()
+        except Exception as e:
+            logger.warning(f"Não foi possível usar cópia pronta do modelo: {type(e).__name__} - {e}")
+            # A cópia continua na pasta de preparo e é removida. Se nem isso for possível, deixa de ser
+            # reivindicada e volta ao pool na próxima sincronização
+            self._excluir(doc_id)
+            with self._lock:
+                self._reivindicadas.discard(doc_id)
+            self._acordar.set()
+            return None
+
+        logger.debug(f"Cópia pronta do modelo utilizada (ID: {doc_id[:15]}...)")
+        return doc_id
@@ -15,3 +15,8 @@ class PastaNaoEncontradaError(Exception):
 
 class DadosInvalidosError(Exception):
     pass
+
+class OpenAiApiError(Exception):
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        self.status = status
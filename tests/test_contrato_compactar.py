@@ -0,0 +1,52 @@
+import unittest
+from src.services.document_extraction.documents.contrato import Contrato
+
+CONTRATANTE = "JOÃO DA SILVA, brasileiro, CPF 529.982.247-25\nEndereço:\nRua das Flores, 123, Campinas/SP\nTelefone:\n(19) 99999-0000\n"
+CONTRATADO = "CONTRATADO: FULANO ADVOGADOS, CNPJ 12.345.678/0001-90\nEndereço:\nAv. Paulista, 1000, São Paulo/SP\nTelefone:\n(11) 3333-4444\n"
+CABECALHO = "FULANO ADVOGADOS ASSOCIADOS\nwww.fulano.adv.br\n"
+RODAPE = "Av. Paulista, 1000 - São Paulo/SP\n"
+
+class TestCompactar(unittest.TestCase):
+
+    def test_hifen_entre_letras_une_a_palavra(self):
+        self.assertEqual(Contrato._compactar("resi-\ndente"), "residente")
+
+    def test_hifen_entre_digitos_e_mantido(self):
+        compactado = Contrato._compactar("CPF 529.982.247-\n25, CEP 01000-\n000, fone 3333-\n4444")
+        self.assertEqual(compactado, "CPF 529.982.247-25, CEP 01000-000, fone 3333-4444")
+
+    def test_numero_isolado_e_mantido(self):
+        self.assertEqual(Contrato._compactar("Rua das Flores,\n123\nCentro"), "Rua das Flores, 123 Centro")
+
+    def test_remove_numeracao_de_pagina(self):
+        self.assertEqual(Contrato._compactar("a\nPágina 1 de 2\nb\n2/2"), "a b")
+        self.assertEqual(Contrato._compactar("a\n1\nb\n2\nc"), "a b c")
+
+    def test_rotulos_das_duas_partes_sao_mantidos(self):
+        compactado = Contrato._compactar(CONTRATANTE + CONTRATADO)
+        self.assertEqual(compactado.count('Endereço:'), 2)
+        self.assertIn('Telefone: (11) 3333-4444', compactado)
+
+class TestCabecalhosRodapes(unittest.TestCase):
+
+    def setUp(self):
+        self.paginas = [CABECALHO + "CONTRATO DE HONORÁRIOS\nCONTRATANTE: " + CONTRATANTE + RODAPE + "Página 1 de 2\n",
+                        CABECALHO + CONTRATADO + "CLÁUSULA PRIMEIRA\n" + RODAPE + "Página 2 de 2\n"]
+
+    def test_detecta_apenas_linhas_nas_bordas(self):
+        self.assertEqual(Contrato._cabecalhos_rodapes(self.paginas),
+                         {'FULANO ADVOGADOS ASSOCIADOS', 'www.fulano.adv.br', 'Av. Paulista, 1000 - São Paulo/SP'})
+
+    def test_secao_com_as_duas_partes(self):
+        trecho = ''.join(self.paginas).split('CONTRATANTE')[1].split('\nCLÁUSULA')[0]
+        compactado = Contrato._compactar(Contrato._remover_cabecalhos(trecho, self.paginas))
+        self.assertEqual(compactado.count('FULANO ADVOGADOS ASSOCIADOS'), 1)
+        self.assertEqual(compactado.count('Endereço:'), 2)
+        self.assertEqual(compactado.count('Telefone:'), 2)
+        self.assertIn('Endereço: Av. Paulista, 1000, São Paulo/SP Telefone: (11) 3333-4444', compactado)
+
+    def test_pagina_unica(self):
+        self.assertEqual(Contrato._cabecalhos_rodapes(self.paginas[:1]), set())
+
+if __name__ == '__main__':
+    unittest.main()
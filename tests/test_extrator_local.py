@@ -0,0 +1,48 @@
+import unittest
+from src.services.document_extraction.documents.extrator_local import ExtratorQualificacao
+
+CLIENTE = (": JOÃO DA SILVA SANTOS, brasileiro, casado, pedreiro, portador do RG n. 12.345.678-9 SSP/SP, "
+           "inscrito no CPF sob o n. 529.982.247-25, residente e domiciliado na Rua das Flores, 123, Centro, "
+           "Campinas/SP, CEP 13010-000")
+ADVOGADO = ("CONTRATADO: SILVA ADVOGADOS, com sede na Av. Paulista, 1000, São Paulo/SP, CEP 01310-100, "
+            "telefone (11) 3333-4444, inscrita no CNPJ sob o n. 12.345.678/0001-90")
+
+class TestExtratorQualificacao(unittest.TestCase):
+
+    def test_cpf_valido(self):
+        self.assertTrue(ExtratorQualificacao.cpf_valido('529.982.247-25'))
+        self.assertFalse(ExtratorQualificacao.cpf_valido('529.982.247-26'))
+        self.assertFalse(ExtratorQualificacao.cpf_valido('111.111.111-11'))
+
+    def test_cpf_com_digito_verificador_invalido(self):
+        self.assertIsNone(ExtratorQualificacao.extrair(CLIENTE.replace('247-25', '247-26') + '.'))
+
+    def test_extrai_contratante(self):
+        dados = ExtratorQualificacao.extrair(f"{CLIENTE}, telefone (19) 99876-5432.")
+        self.assertEqual(dados['nome_completo'], 'JOÃO DA SILVA SANTOS')
+        self.assertEqual(dados['qualificacao'],
+                         'brasileiro, casado, pedreiro, portador do RG n. 12.345.678-9 SSP/SP, '
+                         'inscrito no CPF sob o n. 529.982.247-25, residente e domiciliado na Rua das Flores, '
+                         '123, Centro, Campinas - SP, CEP 13010-000, Telefone: (19) 99876-5432')
+
+    def test_ignora_telefone_do_contratado(self):
+        dados = ExtratorQualificacao.extrair(f"{CLIENTE}.\n{ADVOGADO}")
+        self.assertIsNotNone(dados)
+        self.assertNotIn('Telefone', dados['qualificacao'])
+        self.assertNotIn('01310-100', dados['qualificacao'])
+
+    def test_sem_cep_no_bloco_do_contratante(self):
+        trecho = CLIENTE.replace(', CEP 13010-000', '.') + f"\n{ADVOGADO}"
+        self.assertIsNone(ExtratorQualificacao.extrair(trecho))
+
+    def test_outorgado(self):
+        trecho = f"{CLIENTE}.\n" + ADVOGADO.replace('CONTRATADO', 'OUTORGADO')
+        self.assertNotIn('Telefone', ExtratorQualificacao.extrair(trecho)['qualificacao'])
+
+    def test_hifen_em_numero_no_fim_da_linha(self):
+        dados = ExtratorQualificacao.extrair(CLIENTE.replace('247-25', '247-\n25').replace('13010-000', '13010-\n000') + '.')
+        self.assertIn('529.982.247-25', dados['qualificacao'])
+        self.assertIn('CEP 13010-000', dados['qualificacao'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+from src.services.document_extraction.models.pasta import Pasta
+from src.services.document_extraction.models.regras_captura import MotorRegras
+
+class TestConsultaNome(unittest.TestCase):
+
+    def test_clausula_do_contrato(self):
+        clausula = Pasta.motor_regras.consulta_nome(Pasta.CONTRATO)
+        termos = ['contrato', 'cóntrato', 'côntrato', 'contráto', 'contrâto', 'contrató', 'contratô',
+                  'kit', 'kít',
+                  'assinar', 'ássinar', 'âssinar', 'assínar', 'assinár', 'assinâr',
+                  'cliente', 'clíente', 'cliénte', 'cliênte', 'clienté', 'clientê',
+                  'presta', 'présta', 'prêsta', 'prestá', 'prestâ']
+        self.assertEqual(clausula, '((' + ' or '.join(f"name contains '{termo}'" for termo in termos) + '))')
+
+    def test_cedilha_e_til_em_termo_curto(self):
+        motor = MotorRegras({'t': {'regras_captura': [{'name_contains': [r'acao']}]}})
+        termos = motor.regras('t')[0].termos_nome()[0]
+        self.assertIn('ação', termos)
+        self.assertIn('acao', termos)
+
+    def test_padrao_nao_literal(self):
+        motor = MotorRegras({'t': {'regras_captura': [{'name_contains': [r'contrato'], 'not_name_contains': []},
+                                                      {'name_contains': [r'relat[oó]rio']}]}})
+        self.assertIsNone(motor.consulta_nome('t'))
+
+if __name__ == '__main__':
+    unittest.main()